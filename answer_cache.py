@@ -0,0 +1,118 @@
+import random
+import re
+import zlib
+
+# Question normalization and MinHash near-duplicate matching for memoized Q&A answers.
+# Storage is left to the caller: a document's memo is a list of entries from make_entry().
+QUESTION_STOPWORDS = {
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "by", "can", "could", "do", "does", "for",
+    "from", "give", "i", "in", "is", "it", "its", "let", "me", "mentioned", "of", "on", "or", "please",
+    "s", "say", "should", "tell", "that", "the", "there", "this", "to", "us", "we", "what", "whats",
+    "when", "where", "which", "who", "will", "with", "would", "you",
+}
+NUM_PERMUTATIONS = 64
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+
+def question_terms(question):
+    terms = set()
+    for term in re.findall(r"[a-z0-9]+", question.lower().replace("'", "")):
+        if term in QUESTION_STOPWORDS:
+            continue
+        if len(term) > 4 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.add(term)
+    return terms
+
+
+def normalize_question(question):
+    # Case, punctuation, filler words, plurals and word order do not change the key.
+    return " ".join(sorted(question_terms(question)))
+
+
+def short_terms(terms):
+    # Numbers, acronyms and negations such as "not" have no 4-grams, so they barely move
+    # the similarity; near-duplicates must agree on them exactly.
+    return {term for term in terms if len(term) < 4}
+
+
+def term_tolerance(term, other):
+    # Edits allowed between two long terms: none for short words, where one letter is
+    # often a different word ("rate", "date"), and a typo or two for longer ones.
+    length = max(len(term), len(other))
+    return 0 if length < 6 else 1 if length < 9 else 2
+
+
+def edit_distance(term, other, limit):
+    # Levenshtein distance, or limit + 1 once it is certain to exceed limit.
+    if abs(len(term) - len(other)) > limit:
+        return limit + 1
+    previous = list(range(len(other) + 1))
+    for i, a in enumerate(term, 1):
+        current = [i]
+        for j, b in enumerate(other, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a != b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def terms_align(terms, other):
+    # Every long term of terms appears in other, exactly or within term_tolerance().
+    # A question that differs in one content word ("bids" and "queries") never aligns,
+    # however much of the rest it shares.
+    other = [term for term in other if len(term) >= 4]
+    for term in terms:
+        if len(term) < 4 or term in other:
+            continue
+        if not any(edit_distance(term, candidate, term_tolerance(term, candidate)) <= term_tolerance(term, candidate)
+                   for candidate in other):
+            return False
+    return True
+
+
+def shingles(terms):
+    # Whole terms plus their character 4-grams, so a typo only changes a few shingles.
+    result = set(terms)
+    for term in terms:
+        result.update(term[i:i + 4] for i in range(len(term) - 3))
+    return result
+
+
+def minhash(items):
+    hashes = [zlib.crc32(item.encode("utf-8")) for item in items] or [0]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def similarity(signature, other):
+    # Estimated Jaccard similarity of the two shingle sets.
+    return sum(x == y for x, y in zip(signature, other)) / NUM_PERMUTATIONS
+
+
+def make_entry(question, answer):
+    terms = question_terms(question)
+    return {"question": question, "key": " ".join(sorted(terms)), "signature": minhash(shingles(terms)), "answer": answer}
+
+
+def find_answer(entries, question):
+    # Returns the memoized answer for the same or a near-duplicate question, or None.
+    terms = question_terms(question)
+    if not terms:
+        return None
+    key = " ".join(sorted(terms))
+    for entry in entries:
+        if entry["key"] == key:
+            return entry["answer"]
+    # Near-duplicates must agree term by term. MinHash only picks the closest of the
+    # candidates left, which differ by typos or inflections.
+    signature = minhash(shingles(terms))
+    candidates = []
+    for entry in entries:
+        stored = set(entry["key"].split())
+        if short_terms(stored) == short_terms(terms) and terms_align(terms, stored) and terms_align(stored, terms):
+            candidates.append(entry)
+    best = max(candidates, key=lambda entry: similarity(signature, entry["signature"]), default=None)
+    return best["answer"] if best is not None else None
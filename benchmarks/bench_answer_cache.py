@@ -0,0 +1,78 @@
+"""Q&A latency and LLM calls with per-document answer memoization.
+
+Asks each question cold, then again verbatim and as a reworded near-duplicate, then times
+questions that were precomputed in the background while the "user" was reading. Questions
+that differ from a stored one in a single content word must not reuse its answer; the run
+fails if one does.
+
+Usage: ``python benchmarks/bench_answer_cache.py --pages 200 --latency 0.3``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_retrieval import build_document  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+import pipeline  # noqa: E402
+
+# (question, reworded near-duplicate)
+QUESTION_PAIRS = [
+    ("What is the tender deadline?", "tender deadline"),
+    ("What is the EMD amount?", "What's the amount of EMD"),
+    ("What are the eligibility criteria?", "eligibility criterion?"),
+    ("What is the contract duration?", "What is the duration of the contract"),
+    ("What is the performance guarantee?", "What is the performnce guarantee?"),
+    ("What is the bid opening date?", "What is the bid opning date?"),
+]
+# (stored question, different question that shares most of its words)
+DISTINCT_PAIRS = [
+    ("What is the last date for submission of bids?", "What is the last date for submission of queries?"),
+    ("What is the estimated contract value?", "What is the estimated contract period?"),
+    ("What is the bid validity?", "What is the bid security validity?"),
+    ("What is the performance security amount?", "What is the security amount?"),
+]
+
+
+def ask(question, chunks, index, server, document_key):
+    before = server.request_count
+    start = time.perf_counter()
+    pipeline.answer_question_from_chunks(question, chunks, index, document_key=document_key)
+    return time.perf_counter() - start, server.request_count - before
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    use_mock_llm(url)
+    chunks = pipeline.split_text_into_chunks(pipeline.clean_text(build_document(args.pages)))
+    index = pipeline.BM25Index(chunks)
+
+    print(f"{'question':>38} {'cold (s)':>9} {'calls':>6} {'repeat (s)':>11} {'calls':>6} {'reworded (s)':>13} {'calls':>6}")
+    for question, reworded in QUESTION_PAIRS:
+        cold = ask(question, chunks, index, server, "doc-1")
+        repeat = ask(question, chunks, index, server, "doc-1")
+        near = ask(reworded, chunks, index, server, "doc-1")
+        print(f"{question:>38} {cold[0]:>9.3f} {cold[1]:>6} {repeat[0]:>11.4f} {repeat[1]:>6} {near[0]:>13.4f} {near[1]:>6}")
+
+    for stored, different in DISTINCT_PAIRS:
+        ask(stored, chunks, index, server, "doc-1")
+        _, calls = ask(different, chunks, index, server, "doc-1")
+        print(f"{different:>52} {'asked the LLM' if calls else 'REUSED the answer to: ' + stored}")
+        if not calls:
+            sys.exit(1)
+
+    use_mock_llm(url)
+    futures = pipeline.precompute_answers([q for q, _ in QUESTION_PAIRS], chunks, "doc-2", index)
+    for future in futures:
+        future.result()
+    timings = [ask(q, chunks, index, server, "doc-2") for q, _ in QUESTION_PAIRS]
+    print(f"precomputed: avg {sum(t for t, _ in timings) / len(timings):.4f} s, {sum(c for _, c in timings)} LLM calls")
+    server.shutdown()
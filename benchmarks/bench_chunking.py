@@ -0,0 +1,52 @@
+"""Chunk count (= summary LLM calls) of the token-aware chunker versus 3000-character windows.
+
+Usage: ``python benchmarks/bench_chunking.py --pages 50,200,1000``
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_pdf import page_lines  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def character_windows(text, chunk_size=3000, overlap=300):
+    # The chunker this replaced: fixed windows regardless of tokens, sentences or pages.
+    chunks = []
+    start = 0
+    while start < len(text):
+        chunk = text[start:start + chunk_size].strip()
+        if chunk:
+            chunks.append(chunk)
+        if start + chunk_size >= len(text):
+            break
+        start += chunk_size - overlap
+    return chunks
+
+
+def tender_text(pages, seed=0):
+    rng = random.Random(seed)
+    return "".join(f"\n--- Page {n} ---\n" + "\n".join(page_lines(n, 45, rng)) + "\n" for n in range(1, pages + 1))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="50,200,1000")
+    parser.add_argument("--max-tokens", type=int, default=pipeline.CHUNK_MAX_TOKENS)
+    parser.add_argument("--overlap-tokens", type=int, default=pipeline.CHUNK_OVERLAP_TOKENS)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'old chunks':>11} {'new chunks':>11} {'reduction':>10} {'avg tokens':>11} {'max tokens':>11} {'chunk ms':>9}")
+    for pages in [int(p) for p in args.pages.split(",")]:
+        text = pipeline.clean_text(tender_text(pages))
+        old = character_windows(text)
+        start = time.perf_counter()
+        new = pipeline.split_text_into_chunks(text, args.max_tokens, args.overlap_tokens)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        tokens = [pipeline.estimate_tokens(chunk) for chunk in new]
+        print(f"{pages:>6} {len(old):>11} {len(new):>11} {1 - len(new) / len(old):>9.0%} "
+              f"{sum(tokens) / len(tokens):>11.0f} {max(tokens):>11} {elapsed_ms:>9.0f}")
@@ -0,0 +1,43 @@
+"""Wall-clock speedup of the summary map step as LLM concurrency goes up.
+
+Usage: ``python benchmarks/bench_concurrency.py --chunks 40 --latency 0.5``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_groq_server import start_mock_server  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def run(chunks, workers, rate, url):
+    use_mock_llm(url, rate, pool_size=max(workers, 1))
+    start = time.perf_counter()
+    pipeline.generate_comprehensive_summary(chunks, max_workers=workers)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--rate", type=float, default=50.0, help="limiter requests/second")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="mock returns 429 above this")
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, max_in_flight=args.max_in_flight)
+    chunks = [f"Tender section {i}. " * 150 for i in range(args.chunks)]
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'requests':>9} {'429s':>5}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        server.request_count = server.rate_limited_count = 0
+        elapsed = run(chunks, workers, args.rate, url)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x {server.request_count:>9} {server.rate_limited_count:>5}")
+    server.shutdown()
@@ -0,0 +1,69 @@
+"""Time-to-first-chunk, total time and peak memory of PDF extraction.
+
+Compares the old whole-document path (``text +=`` per page, then clean and chunk) with
+the streaming, page-parallel extractor on a synthetic PDF.
+
+Usage: ``python benchmarks/bench_extraction.py --pages 1000 --workers 4``
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2  # noqa: E402
+from synthetic_pdf import make_pdf  # noqa: E402
+import extraction  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def legacy_chunks(pdf_bytes):
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    text = ""
+    for page_num, page in enumerate(reader.pages):
+        page_text = page.extract_text()
+        if page_text:
+            text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+    yield from pipeline.split_text_into_chunks(pipeline.clean_text(text))
+
+
+def streaming_chunks(pdf_bytes):
+    collected = {"raw": [], "cleaned": [], "chunks": [], "chunk_pages": []}
+    yield from pipeline.iter_document_chunks(pipeline.iter_pdf_text(io.BytesIO(pdf_bytes)), collected)
+
+
+def measure(label, chunk_iter, trace_memory=True):
+    # tracemalloc slows PyPDF2 down several times; pass --skip-memory for clean timings.
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in chunk_iter:
+        count += 1
+        first = first or time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else float("nan")
+    tracemalloc.stop()
+    print(f"{label:>22} {first:>10.2f} {total:>9.2f} {peak:>12.1f} {count:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=extraction.PDF_WORKERS)
+    parser.add_argument("--skip-memory", action="store_true")
+    args = parser.parse_args()
+
+    pdf_bytes = make_pdf(args.pages)
+    print(f"{args.pages}-page PDF, {len(pdf_bytes) / 2**20:.1f} MiB, {os.cpu_count()} CPUs")
+    print(f"{'':>22} {'first (s)':>10} {'total (s)':>9} {'peak (MiB)':>12} {'chunks':>7}")
+    trace_memory = not args.skip_memory
+    measure("legacy", legacy_chunks(pdf_bytes), trace_memory)
+    pipeline.PDF_WORKERS = 1
+    measure("streaming, 1 worker", streaming_chunks(pdf_bytes), trace_memory)
+    pipeline.PDF_WORKERS = args.workers
+    measure(f"streaming, {args.workers} workers", streaming_chunks(pdf_bytes), trace_memory)
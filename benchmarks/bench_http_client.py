@@ -0,0 +1,75 @@
+"""Per-call overhead of a fresh ``requests.post`` per call versus the pooled GroqClient.
+
+With ``--tls`` the mock serves HTTPS with a throwaway self-signed certificate (needs the
+``openssl`` CLI), so every unpooled call pays a TCP and a TLS handshake.
+
+Usage: ``python benchmarks/bench_http_client.py --calls 200 --tls``
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from groq_client import GroqClient, TokenBucket, percentile  # noqa: E402
+
+PAYLOAD = {"model": "llama3-8b-8192", "messages": [{"role": "user", "content": "ping"}], "max_tokens": 10}
+
+
+def self_signed_certificate():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "mock.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-keyout", path, "-out", path + ".crt"],
+        check=True, capture_output=True,
+    )
+    with open(path, "a") as pem, open(path + ".crt") as crt:
+        pem.write(crt.read())
+    return path
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    print(f"{label:>18} {mean_ms:>9.2f} {percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.95) * 1000:>8.2f}")
+    return mean_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+    server, url = start_mock_server(latency=0.0, certfile=self_signed_certificate() if args.tls else None)
+    headers = {"Authorization": "Bearer mock-key", "Content-Type": "application/json"}
+
+    unpooled = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        requests.post(url, headers=headers, json=PAYLOAD, timeout=30, verify=False).raise_for_status()
+        unpooled.append(time.perf_counter() - start)
+
+    client = GroqClient("mock-key", url, rate_limiter=TokenBucket(1e6))
+    client.session.verify = False
+    client.session.trust_env = False  # otherwise REQUESTS_CA_BUNDLE overrides verify=False
+    pooled = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        client.chat(PAYLOAD)
+        pooled.append(time.perf_counter() - start)
+
+    print(f"{args.calls} calls over {'HTTPS' if args.tls else 'HTTP'} to a zero-latency mock")
+    print(f"{'':>18} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    before = report("requests.post", unpooled)
+    after = report("pooled GroqClient", pooled)
+    print(f"per-call overhead reduced by {before - after:.2f} ms ({1 - after / before:.0%})")
+    server.shutdown()
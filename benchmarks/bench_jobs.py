@@ -0,0 +1,105 @@
+"""Background job queue: many sessions at once, and a job resumed after the server dies.
+
+Simulated sessions each submit a different tender and poll their job the way the app does,
+recording how long each poll takes while all jobs run. Then a job is started in a child
+process that is killed halfway through its chunk summaries; a fresh queue on the same
+job table resumes it, and only the chunks that were not checkpointed go to the mock.
+
+Usage: ``python benchmarks/bench_jobs.py --users 8 --pages 40 --latency 0.3``
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp())
+
+from bench_retrieval import build_document  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from groq_client import GroqClient, TokenBucket, percentile  # noqa: E402
+import jobs  # noqa: E402
+import pipeline  # noqa: E402
+
+def point_at(url):
+    # Keeps the on-disk analysis cache, which holds the per-chunk checkpoints.
+    pipeline.llm_client = GroqClient("mock-key", url, rate_limiter=TokenBucket(1000.0))
+
+
+def submit(queue, data, mode):
+    payload = {"name": "bench", "is_pdf": False, "mode": mode, "precompute": []}
+    return queue.submit("analyze", (pipeline.hash_content(data), mode), payload, data)
+
+
+def session(queue, data, mode, polls, finished):
+    started = time.perf_counter()
+    job_id = submit(queue, data, mode)
+    while True:
+        poll_started = time.perf_counter()
+        job = queue.get(job_id)
+        polls.append(time.perf_counter() - poll_started)
+        if job["status"] in jobs.FINISHED:
+            finished.append((time.perf_counter() - started, job["status"]))
+            return
+        time.sleep(0.1)
+
+
+def run_in_child(url, path, data, mode):
+    point_at(url)
+    submit(jobs.open_job_queue(path), data, mode)
+    time.sleep(3600)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=jobs.JOB_WORKERS)
+    parser.add_argument("--mode", choices=["structured", "prose"], default="prose")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    point_at(url)
+
+    queue = jobs.open_job_queue(os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"), workers=args.workers)
+    polls, finished = [], []
+    started = time.perf_counter()
+    sessions = [threading.Thread(target=session, args=(queue, build_document(args.pages, seed=i).encode(), args.mode, polls, finished))
+                for i in range(args.users)]
+    for thread in sessions:
+        thread.start()
+    for thread in sessions:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    polls.sort()
+    seconds = sorted(seconds for seconds, _ in finished)
+    print(f"{args.users} sessions, {args.workers} job workers: {elapsed:.2f}s, {args.users / elapsed * 60:.1f} docs/min, "
+          f"{sum(status == 'done' for _, status in finished)} done")
+    print(f"  per-document p50 {percentile(seconds, 0.5):.2f}s, p95 {percentile(seconds, 0.95):.2f}s")
+    print(f"  {len(polls)} polls: p50 {percentile(polls, 0.5) * 1000:.2f} ms, p95 {percentile(polls, 0.95) * 1000:.2f} ms")
+
+    data = build_document(args.pages, seed=1000).encode()
+    chunks = len(pipeline.split_text_into_chunks(pipeline.clean_text(data.decode())))
+    path = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+    child = multiprocessing.get_context("spawn").Process(target=run_in_child, args=(url, path, data, args.mode))
+    before = server.request_count
+    child.start()
+    while server.request_count - server.in_flight - before < chunks // 2:
+        time.sleep(0.01)
+    time.sleep(0.1)  # let the child store the answers it has received
+    server.handle_error = lambda request, client_address: None  # requests cut off by the kill
+    child.kill()
+    child.join()
+    answered_before_kill = server.request_count - server.in_flight - before
+    before = server.request_count
+    resumed = jobs.open_job_queue(path)
+    resumed.resume()
+    job_id = pipeline.hash_content("analyze", pipeline.hash_content(data), args.mode)[:20]
+    job = resumed.wait(job_id, 600)
+    print(f"restart: {chunks} chunks, {answered_before_kill} answered before the kill, "
+          f"{server.request_count - before} after resuming ({job['status']})")
+    server.shutdown()
@@ -0,0 +1,89 @@
+"""Time and peak memory of clean_text versus the three-pass ASCII-only cleaner it replaced.
+
+Cleans a generated tender of about --mb megabytes, with rupee amounts, Hindi and Tamil
+lines, non-breaking spaces and soft hyphens mixed in, both as one string (the TXT path)
+and page by page (the PDF path). Each run happens in a fresh process so peak RSS is its
+own; the reported memory is peak RSS above the input held in memory.
+
+Usage: ``python benchmarks/bench_normalize.py --mb 100``
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_pdf import page_lines  # noqa: E402
+import pipeline  # noqa: E402
+
+REGIONAL_LINES = [
+    "अनुमानित लागत ₹4,50,00,000 है और बयाना राशि ₹2,50,000 है।",
+    "ஒப்பந்த காலம் 18 மாதங்கள்.",
+    "EMD: ₹ 2,50,000 /- (Rupees Two Lakh Fifty Thousand only)",
+    "Perfor­mance security of 5% of the contract value.",
+]
+
+
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    return text.strip()
+
+
+def tender_pages(megabytes, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for page_number in range(1, 201):
+        lines = page_lines(page_number, 45, rng)
+        for _ in range(4):
+            lines.insert(rng.randrange(len(lines)), rng.choice(REGIONAL_LINES))
+        pages.append(f"\n--- Page {page_number} ---\n" + "\n".join(lines) + "\n")
+    repeats = max(1, int(megabytes * 1e6 / sum(len(page) for page in pages)))
+    return pages * repeats
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(cleaner, layout, megabytes):
+    # Runs in a child process.
+    func = legacy_clean_text if cleaner == "legacy" else pipeline.clean_text
+    pages = tender_pages(megabytes)
+    text = "".join(pages) if layout == "document" else None
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    cleaned = func(text) if layout == "document" else " ".join(filter(None, map(func, pages)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "mb": sum(len(page.encode("utf-8")) for page in pages) / 1e6,
+        "extra_rss_mb": peak_rss_mb() - baseline,
+        "rupees": cleaned.count("₹"),
+        "devanagari": len(re.findall(r"[ऀ-ॿ]", cleaned)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=100)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'cleaner':>8} {'input':>9} {'MB':>7} {'time (s)':>9} {'MB/s':>7} {'extra RSS MB':>13} {'₹ kept':>9} {'Devanagari kept':>16}")
+    for layout in ("document", "pages"):
+        for cleaner in ("legacy", "current"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                r = executor.submit(run, cleaner, layout, args.mb).result()
+            print(f"{cleaner:>8} {layout:>9} {r['mb']:>7.1f} {r['seconds']:>9.2f} {r['mb'] / r['seconds']:>7.1f} "
+                  f"{r['extra_rss_mb']:>13.1f} {r['rupees']:>9} {r['devanagari']:>16}")
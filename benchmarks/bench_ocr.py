@@ -0,0 +1,62 @@
+"""Pages per second of PDF extraction with the OCR fallback on a mixed text/scanned tender.
+
+Extracts an all-text PDF, then the same tender with every --scan-every'th page replaced
+by a scanned image: once with a cold OCR cache for each pool size, and once warm. Needs
+the tesseract binary and pytesseract for the OCR runs; without them only the cost of
+detecting image-only pages is measured.
+
+Usage: ``python benchmarks/bench_ocr.py --pages 60 --scan-every 3 --workers 1,4``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import fresh_cache  # noqa: E402
+from synthetic_pdf import make_pdf  # noqa: E402
+import extraction  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def extract(pdf, workers):
+    progress = pipeline.WarningCollector()
+    start = time.perf_counter()
+    pages = list(pipeline.iter_pdf_text(pdf, progress) if workers is None else
+                 pipeline.iter_ocr_pages(extraction.iter_pdf_pages(pdf), progress, max_workers=workers))
+    return time.perf_counter() - start, pages, progress.warnings
+
+
+def report(label, pages, elapsed, extracted, warnings):
+    print(f"{label:>28} {pages:>6} {elapsed:>9.2f} {pages / elapsed:>9.1f} {extracted:>10}")
+    for warning in warnings:
+        print(f"{'':>28} warning: {warning}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--scan-every", type=int, default=3, help="every n-th page is a scan")
+    parser.add_argument("--workers", default=f"1,{extraction.OCR_WORKERS}", help="OCR pool sizes")
+    args = parser.parse_args()
+
+    scanned = set(range(1, args.pages + 1, args.scan_every))
+    text_pdf = make_pdf(args.pages)
+    mixed_pdf = make_pdf(args.pages, scanned_pages=scanned)
+    print(f"{len(scanned)} of {args.pages} pages scanned; OCR {'available' if extraction.ocr_available() else 'NOT available'}")
+    print(f"{'run':>28} {'pages':>6} {'time (s)':>9} {'pages/s':>9} {'with text':>10}")
+
+    pipeline.analysis_cache = fresh_cache()
+    elapsed, pages, warnings = extract(text_pdf, None)
+    report("text only", args.pages, elapsed, len(pages), warnings)
+    if not extraction.ocr_available():
+        elapsed, pages, warnings = extract(mixed_pdf, None)
+        report("mixed, scans skipped", args.pages, elapsed, len(pages), warnings)
+    else:
+        for workers in sorted({int(w) for w in args.workers.split(",")}):
+            pipeline.analysis_cache = fresh_cache()
+            elapsed, pages, warnings = extract(mixed_pdf, workers)
+            report(f"mixed, cold, {workers} OCR workers", args.pages, elapsed, sum(1 for _, text, _ in pages if text.strip()), warnings)
+        elapsed, pages, warnings = extract(mixed_pdf, workers)
+        report("mixed, warm page cache", args.pages, elapsed, sum(1 for _, text, _ in pages if text.strip()), warnings)
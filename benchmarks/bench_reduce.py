@@ -0,0 +1,54 @@
+"""LLM calls, tree depth and latency of the hierarchical summary reduce per document size.
+
+Each mock summary is about --summary-tokens long, so the single flat consolidation prompt
+the old code built can be compared with the 8192-token context window.
+
+Usage: ``python benchmarks/bench_reduce.py --pages 20,100,400,1000``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_retrieval import build_document  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+import pipeline  # noqa: E402
+
+levels = []
+pack_summary_batches = pipeline.pack_summary_batches
+
+
+def counting_pack(summaries, max_tokens):
+    batches = pack_summary_batches(summaries, max_tokens)
+    levels.append(max(sum(pipeline.estimate_tokens(s) for s in batch) for batch in batches))
+    return batches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="20,100,400,1000")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--summary-tokens", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, completion_tokens=args.summary_tokens)
+    pipeline.SUMMARY_MODE = "prose"
+    pipeline.pack_summary_batches = counting_pack
+    print(f"{'pages':>6} {'chunks':>7} {'map calls':>10} {'reduce calls':>13} {'depth':>6} "
+          f"{'max merge tokens':>17} {'flat prompt tokens':>19} {'seconds':>8}")
+    for pages in [int(p) for p in args.pages.split(",")]:
+        chunks = pipeline.split_text_into_chunks(pipeline.clean_text(build_document(pages)))
+        use_mock_llm(url, pool_size=args.workers)
+        server.request_count = 0
+        levels.clear()
+        start = time.perf_counter()
+        pipeline.generate_comprehensive_summary(chunks, max_workers=args.workers)
+        elapsed = time.perf_counter() - start
+        flat_tokens = len(chunks) * (args.summary_tokens + 20)
+        print(f"{pages:>6} {len(chunks):>7} {len(chunks):>10} {server.request_count - len(chunks):>13} {len(levels):>6} "
+              f"{max(levels, default=0):>17} {flat_tokens:>19} {elapsed:>8.2f}")
+    server.shutdown()
@@ -0,0 +1,92 @@
+"""Recall@k of the BM25 chunk index and Q&A latency versus scanning every chunk.
+
+Builds a synthetic tender with facts planted on known pages, then checks whether the
+chunk holding each answer is among the top-k retrieved chunks.
+
+Usage: ``python benchmarks/bench_retrieval.py --pages 200 --latency 0.3``
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_groq_server import start_mock_server  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+import pipeline  # noqa: E402
+
+FILLER_WORDS = (
+    "the contractor shall work site material supply installation drawing inspection engineer "
+    "clause schedule quantity item rate department agreement specification quality standard "
+    "labour safety maintenance approval document bidder tender authority notice section"
+).split()
+
+# (question, planted sentence, phrase that identifies the answer chunk)
+QUESTIONS = [
+    ("What is the tender deadline?", "The last date for bid submission is 15/03/2025 up to 15:00 hrs.", "15/03/2025"),
+    ("What is the EMD amount?", "Earnest Money Deposit of Rs. 2,50,000 is payable online.", "2,50,000"),
+    ("What is the contract value?", "The estimated cost of the work is Rs. 4.5 crore.", "4.5 crore"),
+    ("What are the eligibility criteria?", "Eligibility criteria: average annual turnover of Rs. 10 crore in the last three years.", "annual turnover"),
+    ("What is the performance security?", "Performance security of 5% of the contract value is required.", "5% of the contract"),
+    ("What is the contract duration?", "The period of completion is 18 months from the date of award.", "18 months"),
+    ("When is the technical bid opening?", "Technical bids will be opened on 17/03/2025 at 16:00 hrs.", "17/03/2025"),
+    ("What are the payment terms?", "Payment shall be released within 30 days of submission of the running bill.", "30 days"),
+]
+
+
+def build_document(pages, seed=7):
+    # Each fact on its own page; documents shorter than len(QUESTIONS) pages get several
+    # facts per page.
+    rng = random.Random(seed)
+    if pages >= len(QUESTIONS):
+        fact_pages = rng.sample(range(pages), len(QUESTIONS))
+    else:
+        fact_pages = [i % pages for i in range(len(QUESTIONS))]
+    planted = {}
+    for page, (_, sentence, _) in zip(fact_pages, QUESTIONS):
+        planted[page] = f"{planted[page]} {sentence}" if page in planted else sentence
+    text = []
+    for page in range(pages):
+        words = " ".join(rng.choice(FILLER_WORDS) for _ in range(350))
+        if page in planted:
+            cut = rng.randrange(len(words))
+            words = f"{words[:cut]}. {planted[page]} {words[cut:]}"
+        text.append(f"\n--- Page {page + 1} ---\n{words}\n")
+    return "".join(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=pipeline.LLM_MAX_WORKERS)
+    parser.add_argument("--skip-llm", action="store_true", help="only report recall and index timings")
+    args = parser.parse_args()
+
+    chunks = pipeline.split_text_into_chunks(pipeline.clean_text(build_document(args.pages)))
+    start = time.perf_counter()
+    index = pipeline.BM25Index(chunks)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(chunks)} chunks, index built in {build_ms:.1f} ms")
+
+    for k in (1, 2, 4, 8):
+        hits, search_ms = 0, 0.0
+        for question, _, phrase in QUESTIONS:
+            start = time.perf_counter()
+            ranked = index.search(question, k)
+            search_ms += (time.perf_counter() - start) * 1000
+            hits += any(phrase in chunks[i] for i in ranked)
+        print(f"recall@{k}: {hits / len(QUESTIONS):.2f}  (avg search {search_ms / len(QUESTIONS):.2f} ms)")
+
+    if not args.skip_llm:
+        server, url = start_mock_server(latency=args.latency)
+        question = QUESTIONS[0][0]
+        for label, top_k in (("full scan", None), (f"top-{pipeline.QA_TOP_K}", pipeline.QA_TOP_K)):
+            server.request_count = 0
+            use_mock_llm(url)
+            start = time.perf_counter()
+            pipeline.answer_question_from_chunks(question, chunks, index, top_k=top_k, max_workers=args.workers)
+            print(f"{label:>10}: {time.perf_counter() - start:6.2f} s, {server.request_count} LLM calls")
+        server.shutdown()
@@ -0,0 +1,57 @@
+"""Time-to-first-token of streamed completions versus waiting for the full response.
+
+Runs the final consolidation call against the local SSE mock and checks that the
+streamed text matches what the blocking call returns.
+
+Usage: ``python benchmarks/bench_streaming.py --latency 0.3 --token-interval 0.02``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_groq_server import start_mock_server  # noqa: E402
+from common import fresh_cache, use_mock_llm  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def timed(call):
+    stats = {"updates": 0}
+
+    def on_token(text, first_token_after):
+        stats["ttft"] = first_token_after
+        stats["updates"] += 1
+
+    start = time.perf_counter()
+    result = call(on_token)
+    stats["total"] = time.perf_counter() - start
+    return result, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, token_interval=args.token_interval, completion_tokens=args.tokens)
+    use_mock_llm(url)
+    context = "Section 1: EMD is Rs. 2,50,000. " * 20
+
+    print(f"{'call':>12} {'mode':>9} {'first token (s)':>16} {'total (s)':>10} {'updates':>8}")
+    for label, call in (
+        ("ask_llm", lambda on_token: pipeline.ask_llm("Consolidate the sections.", context, on_token=on_token)),
+    ):
+        pipeline.analysis_cache = fresh_cache()
+        streamed, stats = timed(call)
+        print(f"{label:>12} {'stream':>9} {stats['ttft']:>16.2f} {stats['total']:>10.2f} {stats['updates']:>8}")
+        pipeline.analysis_cache = fresh_cache()
+        start = time.perf_counter()
+        blocking = call(None)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>12} {'blocking':>9} {elapsed:>16.2f} {elapsed:>10.2f} {1:>8}")
+        assert streamed.startswith("**BASIC INFORMATION:**") and not streamed.startswith("Error"), streamed
+    server.shutdown()
@@ -0,0 +1,37 @@
+"""LLM calls and prompt tokens of structured field extraction versus prose map-reduce.
+
+Usage: ``python benchmarks/bench_structured.py --pages 200``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_retrieval import build_document  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+import pipeline  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    chunks = pipeline.split_text_into_chunks(pipeline.clean_text(build_document(args.pages)))
+    print(f"{len(chunks)} chunks")
+    print(f"{'mode':>11} {'LLM calls':>10} {'prompt tokens':>14} {'seconds':>8} {'regex fields':>13}")
+    for mode in ("prose", "structured"):
+        pipeline.SUMMARY_MODE = mode
+        use_mock_llm(url)
+        server.request_count = server.prompt_tokens = 0
+        start = time.perf_counter()
+        summary, fields = pipeline.summarize_document(chunks)
+        elapsed = time.perf_counter() - start
+        regex_fields = sum(1 for field in fields or [] if field["method"] == "regex")
+        print(f"{mode:>11} {server.request_count:>10} {server.prompt_tokens:>14} {elapsed:>8.2f} {regex_fields:>13}")
+    server.shutdown()
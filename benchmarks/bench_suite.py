@@ -0,0 +1,210 @@
+"""End-to-end benchmark suite over generated tender PDFs and TXTs at several sizes.
+
+Covers PDF extraction, clean_text, chunking, summary formatting, and the full summarize
+and Q&A flows against the local mock endpoint. Reports p50/p95 latency, throughput,
+peak RSS and LLM calls per case, and writes everything as JSON so runs from different
+commits can be compared. Each case runs in a fresh process so peak RSS is its own.
+
+Usage: ``python benchmarks/bench_suite.py --pages 10,100 --output bench.json``
+       ``python benchmarks/bench_suite.py --compare bench.json``
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_retrieval import QUESTIONS, build_document  # noqa: E402
+from common import use_mock_llm  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from synthetic_pdf import make_pdf  # noqa: E402
+from groq_client import percentile  # noqa: E402
+import display  # noqa: E402
+import pipeline  # noqa: E402
+import tracing  # noqa: E402
+
+LLM_CASES = {"summarize_pdf", "summarize_txt", "qa"}
+
+
+def tender_text(pages):
+    return build_document(pages)
+
+
+def tender_pdf(pages):
+    # Same pages as tender_text, wrapped at twelve words per line.
+    page_texts = tender_text(pages).split("\n--- Page ")[1:]
+
+    def page_text(page_number):
+        words = page_texts[page_number - 1].split("\n", 1)[1].split()
+        return [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+
+    return make_pdf(pages, page_text=page_text)
+
+
+def sample_summary():
+    return "\n".join(
+        ["Based on the document, here is the summary:", "**BASIC INFORMATION:**"]
+        + [f"- Field {i}: value {i} of the tender" for i in range(6)]
+        + ["", "**REQUIREMENTS:**", "- Key Eligibility Criteria: Not mentioned"]
+        + [f"* Requirement {i}" for i in range(10)]
+    )
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed_runs(func, repeat, setup=None, totals=None):
+    # Returns per-run seconds and the traced LLM counters summed over all runs.
+    times, totals = [], totals if totals is not None else Counter()
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with tracing.trace("bench") as tracer:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        totals.update({key: value for key, value in tracer.totals().items() if key != "seconds"})
+    return times, totals
+
+
+def run_case(case, pages, config, url):
+    # Runs in a child process. Returns the measured times and the work per run.
+    repeat = config["repeat"]
+    fresh_llm = (lambda: use_mock_llm(url)) if case in LLM_CASES else None
+    if case == "pdf_extract":
+        data = tender_pdf(pages)
+        times, totals = timed_runs(lambda: "".join(pipeline.iter_pdf_text(data)), repeat)
+        work, unit = pages, "pages/s"
+    elif case == "clean_text":
+        text = tender_text(pages)
+        times, totals = timed_runs(lambda: pipeline.clean_text(text), repeat)
+        work, unit = len(text) / 1e6, "MB/s"
+    elif case == "chunking":
+        text = pipeline.clean_text(tender_text(pages))
+        times, totals = timed_runs(lambda: pipeline.split_text_into_chunks(text), repeat)
+        work, unit = len(text) / 1e6, "MB/s"
+    elif case == "format_summary":
+        summary = sample_summary()
+        times, totals = timed_runs(lambda: [display.format_summary_for_display(summary) for _ in range(1000)], repeat)
+        work, unit = 1000, "summaries/s"
+    elif case in ("summarize_pdf", "summarize_txt"):
+        is_pdf = case == "summarize_pdf"
+        data = tender_pdf(pages) if is_pdf else tender_text(pages).encode("utf-8")
+        times, totals = timed_runs(lambda: pipeline.analyze_document(data, is_pdf, mode=config["mode"]), repeat, fresh_llm)
+        work, unit = 60, "docs/min"
+    elif case == "qa":
+        chunks = pipeline.split_text_into_chunks(pipeline.clean_text(tender_text(pages)))
+        index = pipeline.BM25Index(chunks)
+        times, totals = [], Counter()
+        for question, _, _ in QUESTIONS[:repeat]:
+            times += timed_runs(lambda: pipeline.answer_question_from_chunks(question, chunks, index), 1, fresh_llm, totals)[0]
+        work, unit = 1, "questions/s"
+    else:
+        raise ValueError(f"Unknown case: {case}")
+    return {"times": times, "work": work, "unit": unit, "totals": totals, "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def summarize_case(case, pages, measured, server_counts):
+    times = sorted(measured["times"])
+    p50 = percentile(times, 0.50)
+    totals = {key: value / len(times) for key, value in measured["totals"].items()}
+    return {
+        "case": case,
+        "pages": pages,
+        "runs": len(times),
+        "p50_s": round(p50, 6),
+        "p95_s": round(percentile(times, 0.95), 6),
+        "throughput": round(measured["work"] / p50, 3) if p50 else None,
+        "unit": measured["unit"],
+        "peak_rss_mb": measured["peak_rss_mb"],
+        # Per run.
+        "llm_calls": round(totals.get("llm_calls", 0), 2),
+        "retries": round(totals.get("retries", 0), 2),
+        "prompt_tokens": round(totals.get("prompt_tokens", 0)),
+        "completion_tokens": round(totals.get("completion_tokens", 0)),
+        "server_requests": server_counts[0],
+        "server_429s": server_counts[1],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    previous = {(r["case"], r["pages"]): r for r in (baseline or {}).get("results", [])}
+    header = f"{'case':>15} {'pages':>6} {'p50 (s)':>10} {'p95 (s)':>10} {'throughput':>22} {'RSS MB':>7} {'LLM calls':>10}"
+    print(header + (f" {'p50 vs base':>12}" if baseline else ""))
+    for r in results:
+        line = (f"{r['case']:>15} {r['pages'] if r['pages'] is not None else '-':>6} {r['p50_s']:>10.4f} {r['p95_s']:>10.4f} "
+                f"{(r['throughput'] or 0):>10.2f} {r['unit']:<11} {r['peak_rss_mb']:>7.1f} {r['llm_calls']:>10g}")
+        old = previous.get((r["case"], r["pages"]))
+        if baseline:
+            line += f" {r['p50_s'] / old['p50_s']:>11.2f}x" if old and old["p50_s"] else f" {'-':>12}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="10,100", help="document sizes")
+    parser.add_argument("--cases", default="pdf_extract,clean_text,chunking,format_summary,summarize_pdf,summarize_txt,qa")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (questions for qa)")
+    parser.add_argument("--mode", choices=["structured", "prose"], default=pipeline.SUMMARY_MODE)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock seconds per request")
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--token-interval", type=float, default=0.0, help="mock seconds per generated token")
+    parser.add_argument("--completion-tokens", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare p50 against")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, error_rate_429=args.error_rate_429, retry_after=args.retry_after,
+                                    token_interval=args.token_interval, completion_tokens=args.completion_tokens)
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    sizes = [int(p) for p in args.pages.split(",")]
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for case in args.cases.split(","):
+        for pages in ([None] if case == "format_summary" else sizes):
+            requests_before, limited_before = server.request_count, server.rate_limited_count
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                measured = executor.submit(run_case, case, pages, config, url).result()
+            server_counts = (server.request_count - requests_before, server.rate_limited_count - limited_before)
+            results.append(summarize_case(case, pages, measured, server_counts))
+            print(f"  {case} ({pages or '-'} pages) done", file=sys.stderr)
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": config,
+        },
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,62 @@
+"""Segment-level translation: batching, concurrent languages and the per-segment cache.
+
+Translates a structured summary into several languages at once, switches back to one of
+them, then changes a single field and translates again. Also translates a long prose
+summary that a single request capped at 2000 tokens would truncate.
+
+Usage: ``python benchmarks/bench_translation.py --latency 0.3 --languages 4``
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import use_mock_llm  # noqa: E402
+from mock_groq_server import start_mock_server  # noqa: E402
+from field_extraction import SUMMARY_FIELDS, format_fields_as_text  # noqa: E402
+import pipeline  # noqa: E402
+
+LANGUAGES = ["Hindi", "Tamil", "Bengali", "Spanish", "French", "German", "Japanese", "Arabic"]
+
+
+def summary_fields(emd="Rs. 2,50,000"):
+    values = {"emd": emd, "contract_value": "Rs. 4.5 crore", "bid_deadline": "15/03/2025 at 3:00 PM"}
+    return [{"section": section, "key": key, "label": label, "value": values.get(key, f"Details of {label.lower()} as stated in the tender")}
+            for section, key, label in SUMMARY_FIELDS]
+
+
+def run(label, text, languages, server):
+    before = server.request_count
+    start = time.perf_counter()
+    translated = pipeline.translate_summary(text, languages)
+    elapsed = time.perf_counter() - start
+    lines = [line for line in text.split("\n") if line.strip()]
+    complete = all(sum(1 for line in translated[language].split("\n") if line.strip()) == len(lines) and
+                   all(f"[{language}]" in line for line in translated[language].split("\n") if line.strip())
+                   for language in languages)
+    print(f"{label:>34} {len(languages):>6} {elapsed:>9.2f} {server.request_count - before:>9} {'yes' if complete else 'NO':>9}")
+    return translated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--languages", type=int, default=4)
+    parser.add_argument("--prose-lines", type=int, default=400)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    use_mock_llm(url)
+    languages = LANGUAGES[:args.languages]
+    summary = format_fields_as_text(summary_fields())
+
+    print(f"{'run':>34} {'langs':>6} {'time (s)':>9} {'requests':>9} {'complete':>9}")
+    run("structured, one language", summary, languages[:1], server)
+    run("structured, all languages at once", summary, languages, server)
+    run("switch back to first language", summary, languages[:1], server)
+    run("after one field changed", format_fields_as_text(summary_fields(emd="Rs. 3,00,000")), languages, server)
+    prose = "\n".join(f"- Clause {i}: the bidder shall submit the documents listed in section {i} before the deadline." for i in range(args.prose_lines))
+    run(f"prose, {args.prose_lines} lines", prose, languages[:1], server)
+    server.shutdown()
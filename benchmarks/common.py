@@ -0,0 +1,21 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_client import GroqClient, TokenBucket  # noqa: E402
+import pipeline  # noqa: E402
+
+
+def fresh_cache():
+    # Benchmarks measure cold runs, so every measurement gets its own empty cache.
+    return pipeline.DiskCache(os.path.join(tempfile.mkdtemp(), "bench.sqlite3"), 1 << 30)
+
+
+def use_mock_llm(url, rate=1000.0, pool_size=None):
+    # Points the pipeline at a mock endpoint with an empty cache.
+    kwargs = {"pool_size": pool_size} if pool_size else {}
+    pipeline.llm_client = GroqClient("mock-key", url, rate_limiter=TokenBucket(rate), **kwargs)
+    pipeline.analysis_cache = fresh_cache()
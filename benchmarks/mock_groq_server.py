@@ -0,0 +1,143 @@
+"""Local stand-in for the Groq chat-completions endpoint used by the benchmarks.
+
+Run standalone with ``python benchmarks/mock_groq_server.py --port 8765`` or start it
+in-process with ``start_mock_server()``.
+"""
+import argparse
+import json
+import random
+import re
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.request_count += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            over_limit = server.max_in_flight and server.in_flight > server.max_in_flight
+        try:
+            if over_limit or random.random() < server.error_rate_429:
+                with server.lock:
+                    server.rate_limited_count += 1
+                self._send_json(429, {"error": {"message": "Rate limit reached"}},
+                                {"Retry-After": str(server.retry_after)})
+                return
+            time.sleep(server.latency)
+            payload = json.loads(body or b"{}")
+            prompt = payload.get("messages", [{}])[-1].get("content", "")
+            with server.lock:
+                server.prompt_tokens += sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4
+            translate_to = re.search(r"from English to (.+?)\. ", prompt)
+            if translate_to and payload.get("response_format", {}).get("type") == "json_object":
+                # Tag every value of the segment object with the target language.
+                source = json.loads(prompt[prompt.index("{"):])
+                content = json.dumps({key: f"[{translate_to.group(1)}] {value}" for key, value in source.items()}, ensure_ascii=False)
+            elif payload.get("response_format", {}).get("type") == "json_object":
+                # Echo every quoted field name the extraction prompt asks for.
+                keys = re.findall(r'^- "(\w+)"', prompt, re.MULTILINE)
+                content = json.dumps({key: {"value": f"Mock {key}", "confidence": 0.6} for key in keys})
+            else:
+                content = f"**BASIC INFORMATION:**\n- Tender Number/Reference: MOCK/{len(prompt)}\n"
+                content += "- Name of Work/Project:" + " mock" * server.completion_tokens
+            # Like the real API, output stops at max_tokens (about four characters each).
+            content = content[:payload.get("max_tokens", len(content)) * 4]
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            if payload.get("stream"):
+                self._send_stream(content, usage)
+                return
+            time.sleep(server.token_interval * len(content.split(" ")))
+            self._send_json(200, {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                "usage": usage,
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send_stream(self, content, usage):
+        # Server-sent events over chunked transfer encoding, one delta per word, each after
+        # token_interval seconds. Usage rides on the last chunk under x_groq, as Groq sends it.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{"choices": [{"index": 0, "delta": {"content": word + " "}}]} for word in content.split(" ")]
+        events.append({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}})
+        for event in events:
+            time.sleep(self.server.token_interval)
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_mock_server(port=0, latency=0.5, error_rate_429=0.0, max_in_flight=0, retry_after=1,
+                      token_interval=0.0, completion_tokens=20, certfile=None):
+    # certfile: PEM holding a certificate and key; serves HTTPS when given.
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockGroqHandler)
+    if certfile:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(certfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.latency = latency
+    server.error_rate_429 = error_rate_429
+    server.max_in_flight = max_in_flight
+    server.retry_after = retry_after
+    server.token_interval = token_interval
+    server.completion_tokens = completion_tokens
+    server.request_count = 0
+    server.prompt_tokens = 0
+    server.rate_limited_count = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = "https" if certfile else "http"
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/openai/v1/chat/completions"
+    return server, url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=0)
+    parser.add_argument("--token-interval", type=float, default=0.0, help="seconds per generated token")
+    parser.add_argument("--completion-tokens", type=int, default=20)
+    args = parser.parse_args()
+    server, url = start_mock_server(args.port, args.latency, args.error_rate_429, args.max_in_flight,
+                                    token_interval=args.token_interval, completion_tokens=args.completion_tokens)
+    print(f"Mock Groq endpoint listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,78 @@
+"""Minimal PDF writer for tender-like benchmark documents.
+
+Text pages need no third-party packages; scanned pages are rendered with Pillow.
+"""
+import io
+import random
+
+WORDS = (
+    "the contractor shall complete work site material supply installation drawing inspection "
+    "engineer clause schedule quantity item rate department agreement specification quality "
+    "standard labour safety maintenance approval document bidder tender authority notice"
+).split()
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def page_lines(page_number, lines_per_page, rng):
+    lines = [f"Section {page_number}.1 General conditions of contract"]
+    for _ in range(lines_per_page - 1):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + ".")
+    return lines
+
+
+def scanned_image(lines, dpi=150):
+    # A grayscale JPEG of the lines on an A4 page, the way a scanner would store it.
+    from PIL import Image, ImageDraw, ImageFont
+    scale = dpi / 72
+    image = Image.new("L", (int(595 * scale), int(842 * scale)), 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=int(10 * scale))
+    for i, line in enumerate(lines):
+        draw.text((40 * scale, (42 + 14 * i) * scale), line, fill=0, font=font)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=75)
+    return image.size, out.getvalue()
+
+
+def make_pdf(pages, lines_per_page=45, seed=0, page_text=None, scanned_pages=()):
+    # page_text(page_number) may return a list of lines to use instead of filler text.
+    # Pages in scanned_pages hold one full-page image and no text layer.
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_number in range(1, pages + 1):
+        lines = (page_text and page_text(page_number)) or page_lines(page_number, lines_per_page, rng)
+        resources = b"/Font << /F1 3 0 R >>"
+        if page_number in scanned_pages:
+            (width, height), jpeg = scanned_image(lines)
+            objects.append(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 8 "
+                b"/Filter /DCTDecode /Length %d >>\nstream\n%s\nendstream" % (width, height, len(jpeg), jpeg)
+            )
+            resources = b"/XObject << /Im1 %d 0 R >>" % len(objects)
+            stream = b"q 595 0 0 842 0 0 cm /Im1 Do Q"
+        else:
+            stream = "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+            stream = stream.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << %s >> /Contents %d 0 R >>"
+            % (resources, content_id)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
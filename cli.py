@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import pipeline
+import tracing
+
+SUPPORTED_EXTENSIONS = {".pdf", ".txt"}
+
+
+class LogProgress(pipeline.Progress):
+    # Stage changes and warnings go to stderr, prefixed with the document name.
+    def __init__(self, name, verbose=False):
+        self.name = name
+        self.verbose = verbose
+
+    @contextmanager
+    def stage(self, message):
+        if self.verbose:
+            print(f"{self.name}: {message}", file=sys.stderr)
+        yield
+
+    def warning(self, message):
+        print(f"{self.name}: warning: {message}", file=sys.stderr)
+
+
+def find_documents(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def load_completed(output_path):
+    # (content hash, summary mode) of documents summarized in an earlier run. Failed records and a
+    # line cut short by an interrupted run are ignored, so those files are retried.
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not record.get("error"):
+                completed.add((record.get("file_hash"), record.get("mode")))
+    return completed
+
+
+def process_document(path, mode, verbose, trace_dir=None):
+    started = time.perf_counter()
+    record = {"path": path, "file_hash": None, "mode": mode, "summary": None, "fields": None, "chunks": 0, "error": None}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        record["file_hash"] = pipeline.hash_content(data)
+        with tracing.trace(os.path.basename(path)) as tracer:
+            result = pipeline.analyze_document(data, path.lower().endswith(".pdf"), LogProgress(os.path.basename(path), verbose), mode=mode)
+        totals = tracer.totals()
+        record["usage"] = {key: totals[key] for key in ("prompt_tokens", "completion_tokens", "llm_calls", "retries", "cache_hits", "ocr_pages")}
+        if trace_dir:
+            tracer.export_to_dir(trace_dir)
+        record.update(summary=result["summary"], fields=result["summary_fields"], chunks=len(result["text_chunks"]))
+        if result["summary"].startswith(pipeline.SUMMARY_ERROR_PREFIXES):
+            record["error"] = result["summary"]
+    except pipeline.DocumentError as e:
+        record["error"] = str(e)
+    except Exception as e:
+        record["error"] = f"Error processing document: {str(e)}"
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize every PDF/TXT tender in a directory into a JSONL file.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--output", default="summaries.jsonl", help="JSONL file; appended to, and used to skip finished documents")
+    parser.add_argument("--workers", type=int, default=2, help="documents processed at the same time")
+    parser.add_argument("--mode", choices=["structured", "prose"], default=pipeline.SUMMARY_MODE)
+    parser.add_argument("--verbose", action="store_true", help="log every pipeline stage")
+    parser.add_argument("--trace-dir", default=tracing.TRACE_DIR, help="write a Chrome trace of every document here")
+    args = parser.parse_args()
+
+    if not pipeline.llm_client.api_key:
+        print("GROQ_API_KEY is not set; only the local regex pass can run.", file=sys.stderr)
+    paths = find_documents(args.input_dir)
+    completed = load_completed(args.output)
+    pending = []
+    for path in paths:
+        with open(path, "rb") as f:
+            if (pipeline.hash_content(f.read()), args.mode) not in completed:
+                pending.append(path)
+    print(f"{len(paths)} documents found, {len(paths) - len(pending)} already done, {len(pending)} to process", file=sys.stderr)
+
+    # Threads, not processes: documents share one rate limiter, HTTP pool and cache, and
+    # large PDFs are already extracted in a process pool of their own.
+    started = time.perf_counter()
+    failed = 0
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = [executor.submit(process_document, path, args.mode, args.verbose, args.trace_dir) for path in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            failed += bool(record["error"])
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            rate = done / max(1e-9, time.perf_counter() - started) * 60
+            status = f"error: {record['error']}" if record["error"] else "ok"
+            print(f"[{done}/{len(pending)}] {record['path']}: {status} ({record['seconds']:.1f}s, {rate:.1f} docs/min)", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    if pending:
+        print(f"Processed {len(pending)} documents ({failed} failed) in {elapsed:.1f}s: {len(pending) / elapsed * 60:.1f} docs/min", file=sys.stderr)
+    llm_stats = pipeline.llm_client.metrics.snapshot()
+    cache_stats = pipeline.analysis_cache.stats()
+    print(f"LLM: {llm_stats['requests']} requests, {llm_stats['retries']} retries · Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import html
+import re
+
+# HTML for the summary, field and answer cards. Kept free of Streamlit imports so the
+# formatting can be used and benchmarked without running the app script.
+
+
+def format_summary_for_display(summary_text):
+    if not summary_text or summary_text.startswith("Error"):
+        return summary_text
+    
+    content_start_index = summary_text.find('**')
+    if content_start_index != -1:
+        summary_text = summary_text[content_start_index:]
+    else:
+        lines = summary_text.splitlines()
+        for i, line in enumerate(lines):
+            if "information" in line.lower() or "details" in line.lower():
+                summary_text = "\n".join(lines[i+1:])
+                break
+
+    formatted = re.sub(r'\*\*(.*?)\*\*', r'<h4>\1</h4>', summary_text)
+    lines = formatted.split('\n')
+    formatted_lines = []
+    in_list = False
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if in_list:
+                formatted_lines.append('</ul>')
+                in_list = False
+            continue
+            
+        if line.startswith(('* ', '- ', '• ')):
+            if not in_list:
+                formatted_lines.append('<ul>')
+                in_list = True
+            
+            if line.startswith('* '): line = line[2:]
+            elif line.startswith('- '): line = line[2:]
+            elif line.startswith('• '): line = line[2:]
+            
+            formatted_lines.append(f'<li>{line.strip()}</li>')
+        else:
+            if in_list:
+                formatted_lines.append('</ul>')
+                in_list = False
+            
+            if ':' in line and not line.startswith('<h4>'):
+                parts = line.split(':', 1)
+                if len(parts) == 2:
+                    key = parts[0].strip()
+                    value = parts[1].strip()
+                    if value and value.lower() not in ["not mentioned", "not found", "not specified"]:
+                        formatted_lines.append(f'<p><strong>{key}:</strong> {value}</p>')
+                    else:
+                        formatted_lines.append(f'<p><strong>{key}:</strong> <em>Not specified</em></p>')
+                else:
+                    formatted_lines.append(f'<p>{line}</p>')
+            else:
+                formatted_lines.append(f'<p>{line}</p>')
+    
+    if in_list:
+        formatted_lines.append('</ul>')
+    
+    return ''.join(formatted_lines)
+
+
+def format_fields_for_display(fields):
+    formatted_lines = []
+    section = None
+    for field in fields:
+        if field["section"] != section:
+            section = field["section"]
+            formatted_lines.append(f'<h4>{section}:</h4>')
+        if field["value"]:
+            formatted_lines.append(f'<p><strong>{field["label"]}:</strong> {html.escape(field["value"])}</p>')
+        else:
+            formatted_lines.append(f'<p><strong>{field["label"]}:</strong> <em>Not specified</em></p>')
+    return ''.join(formatted_lines)
+
+
+def format_answer_for_display(answer_text):
+    if not answer_text or answer_text.startswith("Error"):
+        return answer_text
+    formatted = answer_text.strip()
+    paragraphs = [p.strip() for p in formatted.split('\n') if p.strip()]
+    return '<br><br>'.join(paragraphs)
@@ -0,0 +1,137 @@
+import functools
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:  # OCR is optional; without it image-only pages are reported and skipped.
+    pytesseract = None
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "50"))
+PDF_PAGES_PER_TASK = 20
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(PDF_WORKERS)))
+OCR_LANGUAGES = os.getenv("OCR_LANGUAGES", "eng")
+# Pages whose text layer is shorter than this are checked for a scanned image.
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "20"))
+
+# Kept free of Streamlit imports so process-pool workers can import it without
+# re-running the app script. Each worker keeps the last PDF it parsed, as (path, reader).
+_worker_reader = None
+# Pools are started from job threads inside the multi-threaded Streamlit server, where a
+# forked child can inherit an import lock held by another thread and hang. Workers are
+# forked from a single-threaded fork server instead, which imports this module once;
+# where there is none (Windows) they are spawned.
+if "forkserver" in multiprocessing.get_all_start_methods():
+    POOL_CONTEXT = multiprocessing.get_context("forkserver")
+    POOL_CONTEXT.set_forkserver_preload(["__main__", __name__])
+else:
+    POOL_CONTEXT = multiprocessing.get_context("spawn")
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(name, max_workers):
+    # One process pool per kind of work and size for the whole server process, started on
+    # first use, so concurrent jobs share max_workers processes instead of each starting
+    # their own.
+    with _pools_lock:
+        if (name, max_workers) not in _pools:
+            _pools[name, max_workers] = ProcessPoolExecutor(max_workers=max_workers, mp_context=POOL_CONTEXT)
+        return _pools[name, max_workers]
+
+
+def discard_pool(name, max_workers, pool):
+    # A pool whose worker died is broken for good; the next shared_pool() call starts a new one.
+    with _pools_lock:
+        if _pools.get((name, max_workers)) is pool:
+            del _pools[name, max_workers]
+
+
+def _page_image(page):
+    # The largest image on the page as encoded bytes, or None. Scanners put the whole
+    # page in one image; smaller ones are logos and stamps.
+    try:
+        return max((image.data for image in page.images), key=len, default=None)
+    except Exception:
+        return None
+
+
+def _extract_page(reader, page_index):
+    # Returns (page_number, text, error, image); image is only set for pages with little
+    # or no text layer, which are the candidates for OCR.
+    try:
+        page = reader.pages[page_index]
+        text = page.extract_text() or ""
+        return page_index + 1, text, None, _page_image(page) if len(text.strip()) < OCR_MIN_CHARS else None
+    except Exception as e:
+        return page_index + 1, "", str(e), None
+
+
+def _extract_page_range(path, start, stop):
+    global _worker_reader
+    if _worker_reader is None or _worker_reader[0] != path:
+        with open(path, "rb") as f:
+            _worker_reader = path, PyPDF2.PdfReader(io.BytesIO(f.read()))
+    return [_extract_page(_worker_reader[1], i) for i in range(start, stop)]
+
+
+def iter_pdf_pages(pdf_bytes, max_workers=PDF_WORKERS, parallel_min_pages=PDF_PARALLEL_MIN_PAGES):
+    # Yields (page_number, text, error, image) in page order. Large PDFs are split into page
+    # ranges extracted in a process pool; results are yielded as soon as the next range
+    # in order is ready, so callers can start on the first pages early.
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+    if max_workers <= 1 or page_count < parallel_min_pages:
+        for i in range(page_count):
+            yield _extract_page(reader, i)
+        return
+    # Workers read the PDF from a temporary file rather than each being sent a copy. A
+    # caller that stops early (or is interrupted) cancels the ranges not yet started.
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_bytes)
+    executor = shared_pool("pdf", max_workers)
+    futures = []
+    try:
+        futures = [
+            executor.submit(_extract_page_range, f.name, start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PDF_PAGES_PER_TASK)
+        ]
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        discard_pool("pdf", max_workers, executor)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+        os.remove(f.name)
+
+
+@functools.lru_cache(maxsize=None)
+def ocr_available():
+    # pytesseract is only a wrapper; the tesseract binary has to be installed as well.
+    if pytesseract is None:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def ocr_image(image_bytes, languages=OCR_LANGUAGES):
+    # Runs in an OCR pool worker. Returns (text, error).
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            return pytesseract.image_to_string(image, lang=languages), None
+    except Exception as e:
+        return "", str(e)
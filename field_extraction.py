@@ -0,0 +1,189 @@
+import json
+import re
+
+# (section, key, label) in the order of the original summary prompt.
+SUMMARY_FIELDS = [
+    ("BASIC INFORMATION", "tender_number", "Tender Number/Reference"),
+    ("BASIC INFORMATION", "work_name", "Name of Work/Project"),
+    ("BASIC INFORMATION", "issuing_authority", "Issuing Department/Organization"),
+    ("FINANCIAL DETAILS", "contract_value", "Estimated Contract Value"),
+    ("FINANCIAL DETAILS", "emd", "EMD (Earnest Money Deposit)"),
+    ("FINANCIAL DETAILS", "emd_exemption", "EMD Exemption (if any)"),
+    ("FINANCIAL DETAILS", "performance_security", "Performance Security"),
+    ("TIMELINE", "bid_deadline", "Bid Submission Deadline"),
+    ("TIMELINE", "technical_bid_opening", "Technical Bid Opening"),
+    ("TIMELINE", "contract_duration", "Contract Duration"),
+    ("REQUIREMENTS", "eligibility", "Key Eligibility Criteria"),
+    ("REQUIREMENTS", "required_documents", "Required Documents"),
+    ("REQUIREMENTS", "technical_specifications", "Technical Specifications (brief)"),
+    ("REQUIREMENTS", "payment_terms", "Payment Terms"),
+]
+FIELD_KEYS = [key for _, key, _ in SUMMARY_FIELDS]
+FIELD_LABELS = {key: label for _, key, label in SUMMARY_FIELDS}
+# Values from several chunks are combined instead of picking a single best one.
+LIST_FIELDS = {"eligibility", "required_documents"}
+MISSING_VALUES = {"", "not mentioned", "not found", "not specified", "not available", "n/a", "na", "none", "null"}
+REGEX_CONFIDENCE = 0.9
+DEFAULT_LLM_CONFIDENCE = 0.5
+
+AMOUNT = r"(?:Rs\.?|INR|₹)\s*[\d,]+(?:\.\d+)?(?:\s*(?:lakhs?|lacs?|crores?|cr\b\.?))?(?:\s*/-)?"
+DATE = (
+    r"\d{1,2}[./-]\d{1,2}[./-]\d{2,4}"
+    r"|\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?,?\s+\d{4}"
+)
+DATE_TIME = rf"(?:{DATE})(?:,?\s*(?:at|upto|up to|by|till)?\s*\d{{1,2}}[:.]\d{{2}}\s*(?:hrs|hours|AM|PM)?\.?)?"
+NEAR = r"[^.]{0,120}?"
+
+FIELD_PATTERNS = {
+    "tender_number": [
+        r"(?:Tender|NIT|Bid|RFP|Enquiry)\s*(?:Reference\s*)?(?:No\.?|Number|ID)\s*[:.\-]?\s*([A-Z0-9][A-Z0-9/\-_.()]*\d[A-Z0-9/\-_.()]*[A-Z0-9)])",
+        r"\bRef(?:erence)?\.?\s*No\.?\s*[:.\-]?\s*([A-Z0-9][A-Z0-9/\-_.()]*\d[A-Z0-9/\-_.()]*[A-Z0-9)])",
+    ],
+    "contract_value": [
+        rf"(?:estimated (?:cost|value)|contract value|tender value|value of (?:the )?(?:work|contract)){NEAR}({AMOUNT})",
+    ],
+    "emd": [
+        rf"(?:\bEMD\b|Earnest Money(?: Deposit)?){NEAR}({AMOUNT})",
+    ],
+    "performance_security": [
+        rf"performance (?:security|guarantee|bank guarantee){NEAR}(\d+(?:\.\d+)?\s*%(?:\s*of (?:the )?(?:contract|tender|bid) (?:value|amount|price))?|{AMOUNT})",
+    ],
+    "bid_deadline": [
+        rf"(?:last|closing|due|end) date (?:and time )?(?:for|of) (?:online )?(?:bid |tender |e-?bid )?submission{NEAR}({DATE_TIME})",
+        rf"bid submission (?:end |closing |last )?date{NEAR}({DATE_TIME})",
+    ],
+    "technical_bid_opening": [
+        rf"technical bids?\s+(?:will|shall)?\s*(?:be\s+)?open(?:ed|ing)?{NEAR}({DATE_TIME})",
+        rf"(?:opening of|open(?:ing)? date (?:of|for)) technical bids?{NEAR}({DATE_TIME})",
+    ],
+    "contract_duration": [
+        r"(?:period of completion|completion period|contract period|contract duration|duration of (?:the )?contract"
+        r"|time (?:allowed|limit) for completion)[^.]{0,80}?(\d+\s*(?:\(\w+\)\s*)?(?:calendar\s+)?(?:months?|days|weeks|years?))",
+    ],
+}
+COMPILED_PATTERNS = {key: [re.compile(p, re.IGNORECASE) for p in patterns] for key, patterns in FIELD_PATTERNS.items()}
+
+
+def regex_candidates(chunk, chunk_id):
+    # Local pre-pass for reference numbers, amounts, dates and durations; fields found
+    # here are not requested from the LLM for this chunk.
+    candidates = {}
+    for key, patterns in COMPILED_PATTERNS.items():
+        for pattern in patterns:
+            match = pattern.search(chunk)
+            if match:
+                value = match.group(1).strip(" .,;")
+                candidates[key] = {"value": value, "confidence": REGEX_CONFIDENCE, "source_chunk": chunk_id, "method": "regex"}
+                break
+    return candidates
+
+
+def build_extraction_prompt(keys):
+    descriptions = "\n".join(f'- "{key}": {FIELD_LABELS[key]}' for key in keys)
+    return (
+        "Extract the following fields from this bid/tender document section. Respond with a single JSON "
+        "object whose keys are exactly the field names below. Each value must be an object "
+        '{"value": string or null, "confidence": number from 0 to 1}. Use null when the section does not '
+        "clearly state the information; do not guess.\n\n" + descriptions
+    )
+
+
+def parse_json_object(text):
+    if not text:
+        return None
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def normalize_value(value):
+    if isinstance(value, list):
+        value = "; ".join(str(item).strip() for item in value if str(item).strip())
+    if value is None:
+        return None
+    value = re.sub(r"\s+", " ", str(value)).strip()
+    return None if value.lower().strip(" .") in MISSING_VALUES else value
+
+
+def llm_candidates(response, keys, chunk_id):
+    candidates = {}
+    for key in keys:
+        entry = (response or {}).get(key)
+        if isinstance(entry, dict):
+            value, confidence = entry.get("value"), entry.get("confidence", DEFAULT_LLM_CONFIDENCE)
+        else:
+            value, confidence = entry, DEFAULT_LLM_CONFIDENCE
+        value = normalize_value(value)
+        if value is None:
+            continue
+        try:
+            confidence = min(1.0, max(0.0, float(confidence)))
+        except (TypeError, ValueError):
+            confidence = DEFAULT_LLM_CONFIDENCE
+        candidates[key] = {"value": value, "confidence": confidence, "source_chunk": chunk_id, "method": "llm"}
+    return candidates
+
+
+def extract_chunk_fields(chunk, chunk_id, ask_json=None):
+    # ask_json(instructions, context) -> dict or None. Without it only the regex pre-pass runs.
+    candidates = regex_candidates(chunk, chunk_id)
+    missing = [key for key in FIELD_KEYS if key not in candidates]
+    if missing and ask_json:
+        candidates.update(llm_candidates(ask_json(build_extraction_prompt(missing), chunk), missing, chunk_id))
+    return candidates
+
+
+def merge_field_candidates(per_chunk_candidates):
+    # Deterministic: the highest-confidence candidate wins, ties go to the earliest chunk.
+    # List fields keep every distinct value, in chunk order.
+    fields = []
+    for section, key, label in SUMMARY_FIELDS:
+        found = [candidates[key] for candidates in per_chunk_candidates if candidates and key in candidates]
+        field = {"section": section, "key": key, "label": label, "value": None, "confidence": 0.0, "source_chunk": None, "method": None}
+        if found:
+            best = sorted(found, key=lambda c: (-c["confidence"], c["source_chunk"]))[0]
+            field.update(best)
+            if key in LIST_FIELDS:
+                values, seen = [], set()
+                for candidate in sorted(found, key=lambda c: c["source_chunk"]):
+                    for item in re.split(r"\s*;\s*", candidate["value"]):
+                        if item and item.lower() not in seen:
+                            seen.add(item.lower())
+                            values.append(item)
+                field["value"] = "; ".join(values)
+        fields.append(field)
+    return fields
+
+
+def format_fields_as_text(fields):
+    # Same layout the prose summary prompt asks for, so display, download and
+    # translation treat both summary modes alike.
+    lines = []
+    section = None
+    for field in fields:
+        if field["section"] != section:
+            section = field["section"]
+            lines.append(f"{chr(10) if lines else ''}**{section}:**")
+        lines.append(f"- {field['label']}: {field['value'] or 'Not mentioned'}")
+    return "\n".join(lines)
+
+
+def comparison_rows(named_fields):
+    # One row per summary field and one column per document, in the order given.
+    # named_fields: (document name, fields from merge_field_candidates or None).
+    values = [(name, {field["key"]: field["value"] for field in fields or []}) for name, fields in named_fields]
+    rows = []
+    for section, key, label in SUMMARY_FIELDS:
+        row = {"Section": section.title(), "Field": label}
+        for name, by_key in values:
+            row[name] = by_key.get(key) or "Not mentioned"
+        rows.append(row)
+    return rows
@@ -0,0 +1,241 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "2"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 10.0
+
+
+class GroqError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    # Shared across worker threads. A 429 halves the refill rate and pauses every caller
+    # until Retry-After has passed; successful calls slowly restore the configured rate.
+    def __init__(self, rate, capacity=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Returns the seconds spent waiting.
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+                self.updated = max(self.updated, now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        with self.lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.updated = self.blocked_until
+
+    def throttle(self, retry_after):
+        with self.lock:
+            self.rate = max(self.max_rate / 8, self.rate / 2)
+        self.pause(retry_after)
+
+    def recover(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_sse_deltas(response, usage=None):
+    # Server-sent events from a `stream: true` chat completion: one JSON chunk per
+    # `data:` line until `data: [DONE]`. The body is read to the end so the connection
+    # goes back to the pool. Token usage, sent with the last chunk, is copied into `usage`.
+    response.encoding = "utf-8"
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            continue
+        event = json.loads(payload)
+        if usage is not None:
+            usage.update(event.get("usage") or (event.get("x_groq") or {}).get("usage") or {})
+        choices = event.get("choices") or []
+        if choices and choices[0].get("delta", {}).get("content"):
+            yield choices[0]["delta"]["content"]
+
+
+def read_streamed_completion(response, on_token, started, usage=None):
+    # on_token(text_so_far, seconds_to_first_token) is called for every delta.
+    parts = []
+    first_token_after = None
+    for delta in iter_sse_deltas(response, usage):
+        if first_token_after is None:
+            first_token_after = time.perf_counter() - started
+        parts.append(delta)
+        on_token("".join(parts), first_token_after)
+    return "".join(parts)
+
+
+def record_usage(usage):
+    for key in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(key), int):
+            tracing.count(key, usage[key])
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class ClientMetrics:
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.statuses = Counter()
+
+    def record(self, latency, status):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "statuses": dict(self.statuses),
+            }
+
+
+def is_retryable(status_code):
+    # Other 4xx statuses (a bad request, an unknown model, a prompt that is too large)
+    # fail the same way every time.
+    return status_code in (408, 429) or status_code >= 500
+
+
+class GroqClient:
+    # One pooled keep-alive session for every Groq call in the process. Retries use
+    # full-jitter exponential backoff. After a 429 or a 5xx the pause goes through the
+    # shared rate limiter, so every caller backs off together while the API is rate
+    # limiting or failing; timeouts and connection errors only delay the failed call.
+    def __init__(self, api_key, url=GROQ_API_URL, pool_size=LLM_POOL_SIZE, rate_limiter=None):
+        self.api_key = api_key
+        self.url = url
+        self.rate_limiter = rate_limiter or TokenBucket(LLM_REQUESTS_PER_SECOND)
+        self.metrics = ClientMetrics()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+        self.consecutive_failures = 0
+        self.failure_lock = threading.Lock()
+
+    def backoff(self):
+        with self.failure_lock:
+            self.consecutive_failures += 1
+            ceiling = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** self.consecutive_failures)
+        return random.uniform(0, ceiling)
+
+    def chat(self, payload, timeout=30, max_retries=3, on_token=None):
+        # Returns the completion text, or None if the response had no choices. Raises
+        # GroqError once retries are exhausted, or at once on a non-retryable status, with
+        # that status as status_code.
+        if on_token:
+            payload = {**payload, "stream": True}
+        last_error = None
+        for attempt in range(max_retries):
+            if attempt:
+                with self.metrics.lock:
+                    self.metrics.retries += 1
+                tracing.count("retries")
+            waited = self.rate_limiter.acquire()
+            if waited:
+                tracing.count("rate_limit_wait", waited)
+            tracing.count("llm_calls")
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=timeout, stream=bool(on_token))
+                self.metrics.record(time.perf_counter() - started, response.status_code)
+                response.raise_for_status()
+                usage = {}
+                if on_token:
+                    content = read_streamed_completion(response, on_token, started, usage)
+                else:
+                    body = response.json()
+                    usage = body.get("usage") or {}
+                    choices = body.get("choices") or []
+                    content = choices[0]["message"]["content"] if choices else None
+                record_usage(usage)
+                with self.failure_lock:
+                    self.consecutive_failures = 0
+                self.rate_limiter.recover()
+                return content
+            except requests.exceptions.HTTPError as e:
+                response.close()
+                last_error = f"HTTP Error {response.status_code}: {str(e)}"
+                if response.status_code == 401:
+                    self.record_failure()
+                    raise GroqError("Invalid API key", status_code=401)
+                if not is_retryable(response.status_code):
+                    self.record_failure()
+                    raise GroqError(last_error, status_code=response.status_code)
+                if attempt == max_retries - 1:
+                    break
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.throttle(retry_after if retry_after is not None else self.backoff())
+                elif response.status_code >= 500:
+                    self.rate_limiter.pause(self.backoff())
+                else:
+                    time.sleep(self.backoff())
+            except Exception as e:
+                last_error = f"Unexpected Error: {str(e)}"
+                if attempt < max_retries - 1:
+                    time.sleep(self.backoff())
+        self.record_failure()
+        raise GroqError(last_error)
+
+    def record_failure(self):
+        with self.metrics.lock:
+            self.metrics.failures += 1
@@ -0,0 +1,270 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pipeline
+from answer_cache import normalize_question
+from tracing import trace
+
+# Background jobs for the Streamlit app. Jobs run on one worker pool per server process and
+# keep their state in SQLite, so they outlive the script run, the session and the browser
+# tab that started them; sessions only poll. Identical jobs (the same file, the same
+# question on the same document) are shared between users. Per-chunk LLM results are
+# checkpointed in the analysis cache as each chunk finishes, so a job resumed after a
+# restart only sends the chunks it had not finished.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUESTION_WORKERS = int(os.getenv("JOB_QUESTION_WORKERS", "4"))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+JOB_UPDATE_INTERVAL = 0.5
+MAX_TRACERS = 100
+MAX_LOADED_DOCUMENTS = 8
+FINISHED = ("done", "failed")
+
+
+class JobProgress(pipeline.Progress):
+    # Writes the current stage, progress, warnings and streamed text to the job row.
+    # Progress and streamed text are written at most every JOB_UPDATE_INTERVAL seconds.
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.job_id = job_id
+        self.stages = []
+        self.last_write = 0.0
+        self.first_token_after = None
+
+    def throttled(self, force=False):
+        now = time.monotonic()
+        if force or now - self.last_write >= JOB_UPDATE_INTERVAL:
+            self.last_write = now
+            return True
+        return False
+
+    @contextmanager
+    def stage(self, message):
+        self.stages.append(message)
+        self.queue.update(self.job_id, stage=message, progress=0.0)
+        try:
+            yield
+        finally:
+            self.stages.pop()
+            if self.stages:
+                self.queue.update(self.job_id, stage=self.stages[-1])
+
+    def update(self, fraction):
+        if self.throttled(fraction >= 1.0):
+            self.queue.update(self.job_id, progress=min(1.0, max(0.0, fraction)))
+
+    def warning(self, message):
+        self.queue.add_warning(self.job_id, message)
+
+    def on_token(self, text, first_token_after):
+        if self.first_token_after is None:
+            self.first_token_after = first_token_after
+        if self.throttled():
+            self.queue.update(self.job_id, partial=text)
+
+
+class JobQueue:
+    # Job kinds listed in lanes get a worker pool of their own, so a question is never
+    # queued behind other sessions' document processing.
+    def __init__(self, path, handlers, workers=JOB_WORKERS, lanes=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.upload_dir = os.path.join(os.path.dirname(path) or ".", "uploads")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.handlers = handlers
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.tracers = {}
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, status TEXT, stage TEXT, progress REAL, "
+            "partial TEXT, warnings TEXT, payload TEXT, result TEXT, error TEXT, created REAL, updated REAL)"
+        )
+        self.conn.commit()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.lanes = {kind: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"job-{kind}") for kind, size in (lanes or {}).items()}
+
+    def submit(self, kind, key, payload, data=None):
+        # Returns the job id. A job that is queued, running or done is shared; a failed job,
+        # or one that finished with an error, is run again.
+        job_id = pipeline.hash_content(kind, *key)[:20]
+        with self.lock:
+            row = self.conn.execute("SELECT status, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row and (row[0] not in FINISHED or not row[1]):
+                return job_id
+            if data is not None:
+                payload = {**payload, "upload": os.path.join(self.upload_dir, job_id)}
+                with open(payload["upload"], "wb") as f:
+                    f.write(data)
+            now = time.time()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, 'queued', 'Waiting for a worker...', 0, '', '[]', ?, NULL, NULL, ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), now, now)
+            )
+            self.conn.commit()
+        self.lanes.get(kind, self.executor).submit(self.run, job_id)
+        return job_id
+
+    def run(self, job_id):
+        with self.lock:
+            kind, payload = self.conn.execute("SELECT kind, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        payload = json.loads(payload)
+        self.update(job_id, status="running", stage="Starting...")
+        progress = JobProgress(self, job_id)
+        try:
+            with trace(payload.get("name") or kind) as tracer:
+                result = self.handlers[kind](payload, progress)
+            self.remember_tracer(job_id, tracer)
+            final = dict(status="done", progress=1.0, partial="", error=result.get("error"),
+                         result=json.dumps(result, ensure_ascii=False))
+        except Exception as e:
+            final = dict(status="failed", partial="", error=str(e) or type(e).__name__)
+        # The upload is removed before the job is marked finished: once it is, submit() may
+        # run the job again and write a new upload to the same path.
+        if payload.get("upload") and os.path.exists(payload["upload"]):
+            os.remove(payload["upload"])
+        self.update(job_id, **final)
+
+    def update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.conn.execute(f"UPDATE jobs SET {assignments}, updated = ? WHERE id = ?", (*fields.values(), time.time(), job_id))
+            self.conn.commit()
+            if fields.get("status") in FINISHED:
+                self.finished.notify_all()
+
+    def add_warning(self, job_id, message):
+        with self.lock:
+            row = self.conn.execute("SELECT warnings FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            warnings = json.loads(row[0]) + [message]
+            self.conn.execute("UPDATE jobs SET warnings = ?, updated = ? WHERE id = ?", (json.dumps(warnings, ensure_ascii=False), time.time(), job_id))
+            self.conn.commit()
+
+    def get(self, job_id):
+        # Job state for polling; the result is loaded separately with result().
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, kind, status, stage, progress, partial, warnings, error, created, updated FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("id", "kind", "status", "stage", "progress", "partial", "warnings", "error", "created", "updated"), row))
+        job["warnings"] = json.loads(job["warnings"])
+        return job
+
+    def wait(self, job_id, timeout):
+        # Blocks until the job has finished or timeout has passed, so that answers from the
+        # memo or the cache show up without waiting for the next poll.
+        def finished():
+            row = self.conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row is None or row[0] in FINISHED
+        with self.finished:
+            self.finished.wait_for(finished, timeout)
+        return self.get(job_id)
+
+    def result(self, job_id):
+        with self.lock:
+            row = self.conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def tracer(self, job_id):
+        return self.tracers.get(job_id)
+
+    def remember_tracer(self, job_id, tracer):
+        with self.lock:
+            self.tracers.pop(job_id, None)
+            self.tracers[job_id] = tracer
+            while len(self.tracers) > MAX_TRACERS:
+                self.tracers.pop(next(iter(self.tracers)))
+
+    def purge(self):
+        cutoff = time.time() - JOB_RETENTION_HOURS * 3600
+        with self.lock:
+            self.conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?", (cutoff,))
+            self.conn.commit()
+
+    def resume(self):
+        # Jobs cut off by a restart run again; chunks they finished come from the cache.
+        with self.lock:
+            rows = self.conn.execute("SELECT id, kind, payload FROM jobs WHERE status NOT IN ('done', 'failed') ORDER BY created").fetchall()
+        for job_id, kind, payload in rows:
+            upload = json.loads(payload).get("upload")
+            if upload and not os.path.exists(upload):
+                self.update(job_id, status="failed", error="The uploaded file was lost in a restart. Please upload it again.")
+            else:
+                self.update(job_id, status="queued", stage="Waiting for a worker...")
+                self.lanes.get(kind, self.executor).submit(self.run, job_id)
+
+
+loaded_documents = {}
+loaded_documents_lock = threading.Lock()
+
+
+def load_document(queue, analysis_job):
+    # Chunks, page ranges and BM25 index of a finished analysis job, kept in memory for the
+    # documents questions were asked about most recently.
+    with loaded_documents_lock:
+        if analysis_job in loaded_documents:
+            loaded_documents[analysis_job] = loaded_documents.pop(analysis_job)
+            return loaded_documents[analysis_job]
+    result = queue.result(analysis_job)
+    if result is None:
+        raise pipeline.DocumentError("The document for this question is no longer available. Please upload it again.")
+    document = {"text_chunks": result["text_chunks"], "chunk_pages": result["chunk_pages"], "chunk_index": pipeline.BM25Index(result["text_chunks"])}
+    with loaded_documents_lock:
+        loaded_documents[analysis_job] = document
+        while len(loaded_documents) > MAX_LOADED_DOCUMENTS:
+            loaded_documents.pop(next(iter(loaded_documents)))
+    return document
+
+
+def run_analysis_job(payload, progress):
+    with open(payload["upload"], "rb") as f:
+        data = f.read()
+    try:
+        with progress.stage("🔄 Processing document..."):
+            result = pipeline.analyze_document(data, payload["is_pdf"], progress, on_token=progress.on_token, mode=payload["mode"])
+    except pipeline.DocumentError:
+        raise
+    except Exception as e:
+        raise pipeline.DocumentError(f"Error processing document: {str(e)}") from e
+    result["error"] = result["summary"] if result["summary"].startswith(pipeline.SUMMARY_ERROR_PREFIXES) else None
+    result["summary_ttft"] = progress.first_token_after
+    if payload.get("precompute") and pipeline.llm_client.api_key:
+        pipeline.precompute_answers(
+            payload["precompute"], result["text_chunks"], result["file_hash"],
+            pipeline.BM25Index(result["text_chunks"]), result["chunk_pages"]
+        )
+    return result
+
+
+def run_question_job(payload, progress):
+    document = load_document(progress.queue, payload["analysis_job"])
+    answer = pipeline.answer_question_from_chunks(
+        payload["question"], document["text_chunks"], document["chunk_index"], chunk_pages=document["chunk_pages"],
+        on_token=progress.on_token, progress=progress, document_key=payload["document_key"]
+    )
+    return {"answer": answer, "ttft": progress.first_token_after, "error": answer if answer.startswith("Error") else None}
+
+
+def submit_analysis(queue, data, is_pdf, name, mode=None, precompute=()):
+    mode = mode or pipeline.SUMMARY_MODE
+    payload = {"name": name, "is_pdf": is_pdf, "mode": mode, "precompute": list(precompute)}
+    return queue.submit("analyze", (pipeline.hash_content(data), mode), payload, data)
+
+
+def submit_question(queue, question, analysis_job, document_key):
+    key = normalize_question(question) or question.strip().lower()
+    payload = {"name": "question", "question": question, "analysis_job": analysis_job, "document_key": document_key}
+    return queue.submit("question", (analysis_job, key), payload)
+
+
+def open_job_queue(path=None, workers=JOB_WORKERS, question_workers=JOB_QUESTION_WORKERS):
+    # Opening a queue starts no job; the app calls purge() and resume() on the one it keeps.
+    path = path or os.path.join(pipeline.CACHE_DIR, "jobs.sqlite3")
+    return JobQueue(path, {"analyze": run_analysis_job, "question": run_question_job}, workers, {"question": question_workers})
@@ -1,18 +1,21 @@
 import streamlit as st
-import PyPDF2
-import requests
-import os
-from dotenv import load_dotenv
-import re
-import time
-from datetime import datetime
+import csv
+import html
+import io
 import json
+from contextlib import contextmanager
+from datetime import datetime
 import streamlit.components.v1 as components
+from display import format_answer_for_display, format_fields_for_display, format_summary_for_display
+from field_extraction import comparison_rows
+from jobs import FINISHED, open_job_queue, submit_analysis, submit_question
+from pipeline import (
+    Progress, analysis_cache, format_page_sources, hash_content, llm_client, translate_summary,
+)
+from tracing import TRACE_DIR, trace
 
-# Load environment variables
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+JOB_WAIT_SECONDS = 0.5
+SAMPLE_QUESTIONS = ["What is the tender deadline?", "What are the eligibility criteria?", "What is the contract value?"]
 
 # Page configuration
 st.set_page_config(
@@ -22,6 +25,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    # One job queue per server process, opened on the first script run. Jobs cut off by a
+    # restart are resumed only under `streamlit run`, so importing this script or jobs.py
+    # elsewhere never starts them.
+    queue = open_job_queue()
+    if st.runtime.exists():
+        queue.purge()
+        queue.resume()
+    return queue
+
+job_queue = get_job_queue()
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -66,229 +82,164 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def split_text_into_chunks(text, chunk_size=3000, overlap=300):
-    if not text or len(text.strip()) == 0:
-        return []
-    chunks = []
-    start = 0
-    text_length = len(text)
-    while start < text_length:
-        end = min(start + chunk_size, text_length)
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        if end >= text_length:
-            break
-        start += chunk_size - overlap
-    return chunks
-
-def extract_text_from_pdf(pdf_file):
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page_num, page in enumerate(pdf_reader.pages):
+class StreamlitProgress(Progress):
+    # Each stage gets a spinner and its own progress bar; nested stages stack.
+    def __init__(self):
+        self.bars = []
+
+    @contextmanager
+    def stage(self, message):
+        with st.spinner(message):
+            self.bars.append(st.progress(0))
             try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-            except Exception as e:
-                st.warning(f"Error reading page {page_num + 1}: {str(e)}")
-                continue
-        if not text.strip():
-            st.error("No text could be extracted from the PDF. The PDF might be password-protected or contain only images.")
-            return None
-        return text
-    except Exception as e:
-        st.error(f"Error reading PDF file: {str(e)}")
-        return None
-
-def format_summary_for_display(summary_text):
-    if not summary_text or summary_text.startswith("Error"):
-        return summary_text
-    
-    content_start_index = summary_text.find('**')
-    if content_start_index != -1:
-        summary_text = summary_text[content_start_index:]
-    else:
-        lines = summary_text.splitlines()
-        for i, line in enumerate(lines):
-            if "information" in line.lower() or "details" in line.lower():
-                summary_text = "\n".join(lines[i+1:])
-                break
-
-    formatted = re.sub(r'\*\*(.*?)\*\*', r'<h4>\1</h4>', summary_text)
-    lines = formatted.split('\n')
-    formatted_lines = []
-    in_list = False
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if in_list:
-                formatted_lines.append('</ul>')
-                in_list = False
+                yield
+            finally:
+                self.bars.pop()
+
+    def update(self, fraction):
+        if self.bars:
+            self.bars[-1].progress(min(1.0, max(0.0, fraction)))
+
+    def warning(self, message):
+        st.warning(message)
+
+def record_trace(label, tracer):
+    st.session_state.setdefault("traces", {})[label] = tracer
+    if TRACE_DIR:
+        tracer.export_to_dir(TRACE_DIR)
+
+def render_footer():
+    st.markdown("---")
+    st.markdown("""<div style="text-align: center; padding: 2rem; color: #666;"><p>🚀 Bid Analyser Pro v2.0</p></div>""", unsafe_allow_html=True)
+
+def render_comparison(uploaded_files):
+    # Each tender is analysed as a background job, so touching a widget or refreshing the
+    # page does not stop it. Jobs are kept per file hash, so adding a file only processes
+    # the new one. The table gains a column as each job finishes.
+    st.subheader("📊 Tender Comparison")
+    if not uploaded_files:
+        st.markdown("""<div class="upload-section"><h2>📤 Upload the Tenders to Compare</h2><p>Drop several PDF or TXT files in the sidebar to compare their key fields side by side</p></div>""", unsafe_allow_html=True)
+        return
+    comparison = st.session_state.setdefault("comparison", {})
+    documents, labels = [], set()
+    for uploaded in uploaded_files:
+        data = uploaded.getvalue()
+        key = hash_content(data)
+        if any(key == other for _, other in documents):
             continue
-            
-        if line.startswith(('* ', '- ', '• ')):
-            if not in_list:
-                formatted_lines.append('<ul>')
-                in_list = True
-            
-            if line.startswith('* '): line = line[2:]
-            elif line.startswith('- '): line = line[2:]
-            elif line.startswith('• '): line = line[2:]
-            
-            formatted_lines.append(f'<li>{line.strip()}</li>')
-        else:
-            if in_list:
-                formatted_lines.append('</ul>')
-                in_list = False
-            
-            if ':' in line and not line.startswith('<h4>'):
-                parts = line.split(':', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = parts[1].strip()
-                    if value and value.lower() not in ["not mentioned", "not found", "not specified"]:
-                        formatted_lines.append(f'<p><strong>{key}:</strong> {value}</p>')
-                    else:
-                        formatted_lines.append(f'<p><strong>{key}:</strong> <em>Not specified</em></p>')
-                else:
-                    formatted_lines.append(f'<p>{line}</p>')
-            else:
-                formatted_lines.append(f'<p>{line}</p>')
-    
-    if in_list:
-        formatted_lines.append('</ul>')
-    
-    return ''.join(formatted_lines)
-
-
-def format_answer_for_display(answer_text):
-    if not answer_text or answer_text.startswith("Error"):
-        return answer_text
-    formatted = answer_text.strip()
-    paragraphs = [p.strip() for p in formatted.split('\n') if p.strip()]
-    return '<br><br>'.join(paragraphs)
-
-def clean_text(text):
-    if not text:
-        return ""
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    return text.strip()
-
-def ask_llm(question, context, max_retries=3):
-    if not GROQ_API_KEY:
-        return "Error: GROQ_API_KEY not found in environment variables."
-    if not context or not context.strip():
-        return "Error: No context provided for analysis."
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    messages = [
-        {"role": "system", "content": "You are an expert document analyst specializing in bid and tender documents. Provide clear, accurate, and structured responses based on the document content. If information is not found, clearly state that."},
-        {"role": "user", "content": f"Document Content:\n{context}\n\nQuestion: {question}\n\nPlease provide a detailed and structured response based on the document content."}
-    ]
-    data = {"model": "llama3-8b-8192", "messages": messages, "temperature": 0.3, "max_tokens": 1000}
-    last_error = None
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(GROQ_API_URL, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            response_data = response.json()
-            if 'choices' in response_data and len(response_data['choices']) > 0:
-                return response_data["choices"][0]["message"]["content"]
-            else:
-                return "Error: Invalid response format from API."
-        except requests.exceptions.HTTPError as e:
-            last_error = f"HTTP Error {response.status_code}: {str(e)}"
-            if response.status_code == 429:
-                time.sleep(min(2 ** attempt, 10))
-                continue
-            elif response.status_code == 401:
-                return "Error: Invalid API key. Please check your GROQ_API_KEY."
-            else:
-                time.sleep(1)
-                continue
-        except Exception as e:
-            last_error = f"Unexpected Error: {str(e)}"
-            time.sleep(1)
+        label = uploaded.name if uploaded.name not in labels else f"{uploaded.name} ({len(documents) + 1})"
+        labels.add(label)
+        documents.append((label, key))
+        if key not in comparison:
+            comparison[key] = {"job": submit_analysis(job_queue, data, uploaded.type == "application/pdf", uploaded.name, mode="structured")}
+
+    pending = []
+    for label, key in documents:
+        entry = comparison[key]
+        if "seconds" in entry:
             continue
-    return f"Error after {max_retries} attempts: {last_error}"
-
-def translate_text_with_llm(text_to_translate, target_language):
-    if not GROQ_API_KEY:
-        return "Error: GROQ_API_KEY not found. Cannot translate."
-    prompt = f"""Translate the following English text to {target_language}. Provide ONLY the translated text, without any introductory phrases, explanations, or quotation marks. Text to translate:\n---\n{text_to_translate}\n---"""
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    messages = [
-        {"role": "system", "content": f"You are an expert translator. Your task is to translate English text into {target_language} accurately."},
-        {"role": "user", "content": prompt}
-    ]
-    data = {"model": "llama3-8b-8192", "messages": messages, "temperature": 0.1, "max_tokens": 2000}
-    try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=data, timeout=45)
-        response.raise_for_status()
-        response_data = response.json()
-        if 'choices' in response_data and len(response_data['choices']) > 0:
-            return response_data["choices"][0]["message"]["content"]
-        else:
-            return "Error: Could not get a valid translation from the API."
-    except Exception as e:
-        return f"Error during translation API call: {str(e)}"
-
-def generate_comprehensive_summary(text_chunks):
-    if not text_chunks:
-        return "No content available for summarization."
-    summary_prompt = """Analyze this bid/tender document and extract the following key information. If any information is not found, clearly state "Not mentioned" or "Not found":\n\n**BASIC INFORMATION:**\n- Tender Number/Reference:\n- Name of Work/Project:\n- Issuing Department/Organization:\n\n**FINANCIAL DETAILS:**\n- Estimated Contract Value:\n- EMD (Earnest Money Deposit):\n- EMD Exemption (if any):\n- Performance Security:\n\n**TIMELINE:**\n- Bid Submission Deadline:\n- Technical Bid Opening:\n- Contract Duration:\n\n**REQUIREMENTS:**\n- Key Eligibility Criteria:\n- Required Documents:\n- Technical Specifications (brief):\n- Payment Terms:\n\nProvide only the information that is clearly mentioned in the document."""
-    all_summaries = []
-    with st.spinner("Analyzing document sections..."):
-        progress_bar = st.progress(0)
-        for i, chunk in enumerate(text_chunks):
-            try:
-                summary = ask_llm(summary_prompt, chunk)
-                if not summary.startswith("Error"):
-                    all_summaries.append(summary)
-                progress_bar.progress((i + 1) / len(text_chunks))
-                time.sleep(1.2)
-            except Exception as e:
-                st.warning(f"Error processing chunk {i+1}: {str(e)}")
-                continue
-    if not all_summaries:
-        return "Unable to generate summary due to processing errors."
-    final_summary_prompt = f"""Based on the following analysis sections from the same document, create a single comprehensive summary by combining and deduplicating the information:\n\n{chr(10).join([f"Section {i+1}:\n{summary}\n" for i, summary in enumerate(all_summaries)])}\n\nProvide a final consolidated summary with the same structure, keeping only the most complete and accurate information for each field."""
-    try:
-        final_summary = ask_llm(final_summary_prompt, "")
-        return final_summary if not final_summary.startswith("Error") else all_summaries[0]
-    except:
-        return all_summaries[0] if all_summaries else "Summary generation failed."
-
-def answer_question_from_chunks(question, text_chunks):
-    if not text_chunks:
-        return "No document content available to answer the question."
-    relevant_answers = []
-    with st.spinner("Searching through document..."):
-        progress_bar = st.progress(0)
-        for i, chunk in enumerate(text_chunks):
-            try:
-                answer = ask_llm(question, chunk)
-                if (not answer.startswith("Error") and "not found" not in answer.lower() and "not mentioned" not in answer.lower() and len(answer.strip()) > 20):
-                    relevant_answers.append(answer)
-                progress_bar.progress((i + 1) / len(text_chunks))
-                time.sleep(1.2)
-            except Exception as e:
-                st.warning(f"Error processing chunk {i+1}: {str(e)}")
-                continue
-    if not relevant_answers:
-        return "No relevant information found in the document to answer your question."
-    if len(relevant_answers) == 1:
-        return relevant_answers[0]
-    combined_prompt = f"Question: {question}\n\nMultiple relevant sections found:\n{chr(10).join([f'Section {i+1}: {answer}' for i, answer in enumerate(relevant_answers)])}\n\nProvide a comprehensive answer by combining the relevant information from all sections, removing duplicates and contradictions."
-    try:
-        final_answer = ask_llm(combined_prompt, "")
-        return final_answer if not final_answer.startswith("Error") else relevant_answers[0]
-    except:
-        return relevant_answers[0]
+        job = job_queue.get(entry["job"])
+        if job is not None and job["status"] not in FINISHED:
+            pending.append(entry["job"])
+            continue
+        result = (job_queue.result(entry["job"]) if job else None) or {}
+        entry.update(
+            summary=result.get("summary"),
+            fields=result.get("summary_fields"),
+            error=job["error"] if job else "This analysis is no longer available. Please upload the document again.",
+            warnings=job["warnings"] if job else [],
+            seconds=job["updated"] - job["created"] if job else 0.0,
+        )
+        if job_queue.tracer(entry["job"]):
+            record_trace(f"Compare: {label}", job_queue.tracer(entry["job"]))
+
+    def compared():
+        return [
+            (f"{label} ⚠️" if comparison[key]["error"] else label, comparison[key]["fields"])
+            for label, key in documents if "seconds" in comparison[key]
+        ]
+
+    if compared():
+        st.dataframe(comparison_rows(compared()), use_container_width=True, hide_index=True)
+    if pending:
+        render_comparison_status(pending, len(documents))
+    if not compared():
+        return
+
+    rows = comparison_rows(compared())
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    st.download_button(
+        label="📥 Download Comparison (CSV)",
+        data=output.getvalue(),
+        file_name=f"tender_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+    for label, key in documents:
+        entry = comparison[key]
+        if "seconds" not in entry:
+            continue
+        with st.expander(f"📄 {label} · {entry['seconds']:.1f}s"):
+            for warning in entry["warnings"]:
+                st.warning(warning)
+            if entry["error"]:
+                st.markdown(f'<div class="error-card"><h4>⚠️ Error:</h4><p>{html.escape(entry["error"])}</p></div>', unsafe_allow_html=True)
+            elif entry["fields"]:
+                st.markdown(f'<div class="summary-card">{format_fields_for_display(entry["fields"])}</div>', unsafe_allow_html=True)
+            else:
+                st.markdown(f'<div class="summary-card">{format_summary_for_display(entry["summary"])}</div>', unsafe_allow_html=True)
+
+def render_trace_panel(traces):
+    for label, tracer in traces.items():
+        totals = tracer.totals()
+        st.markdown(f"**{label}** · {totals['seconds']:.2f}s · {totals['llm_calls']} LLM calls · "
+                    f"{totals['prompt_tokens'] + totals['completion_tokens']} tokens · {totals['cache_hits']} cache hits")
+        stages = sorted(tracer.summary().items(), key=lambda item: -item[1]["self_seconds"])
+        st.dataframe([
+            {
+                "Stage": name,
+                "Calls": stage["count"],
+                "Self seconds": round(stage["self_seconds"], 3),
+                "Seconds": round(stage["seconds"], 3),
+                "Tokens": stage["prompt_tokens"] + stage["completion_tokens"],
+                "Retries": stage["retries"],
+                "Rate-limit wait": round(stage["rate_limit_wait"], 2),
+                "Cache hits": stage["cache_hits"],
+            }
+            for name, stage in stages
+        ], use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Chrome trace (JSON)",
+            data=json.dumps(tracer.to_chrome_trace()),
+            file_name=f"trace_{label.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key=f"trace_download_{label}",
+            use_container_width=True
+        )
+
+@st.fragment(run_every=1.0)
+def render_comparison_status(job_ids, total):
+    # Polls the unfinished comparison jobs; the whole page reruns as each one finishes.
+    jobs = [job_queue.get(job_id) for job_id in job_ids]
+    if any(job is None or job["status"] in FINISHED for job in jobs):
+        st.rerun()
+    done = total - len(jobs)
+    st.progress(done / total, text=f"{done} of {total} tenders analysed · " + " · ".join(job["stage"] for job in jobs))
+
+@st.fragment(run_every=1.0)
+def render_job_status(job_id):
+    # Polls a background job; the whole page reruns once it has finished.
+    job = job_queue.get(job_id)
+    if job is None or job["status"] in FINISHED:
+        st.rerun()
+    st.progress(min(1.0, max(0.0, job["progress"] or 0.0)), text=job["stage"])
+    for warning in job["warnings"]:
+        st.warning(warning)
+    if job["partial"]:
+        st.markdown(job["partial"] + " ▌")
 
 def main():
     if 'qa_history' not in st.session_state:
@@ -299,18 +250,34 @@ def main():
     with st.sidebar:
         st.header("🔧 Controls")
         
-        st.subheader("📁 Upload Document")
-        uploaded_file = st.file_uploader("Choose a PDF or TXT file", type=["pdf", "txt"], help="Upload your bid document for analysis")
+        compare_mode = st.radio("Mode", ["Single document", "Compare tenders"], horizontal=True) == "Compare tenders"
+        uploaded_file = uploaded_files = None
+        if compare_mode:
+            st.subheader("📁 Upload Tenders")
+            uploaded_files = st.file_uploader("Choose PDF or TXT files", type=["pdf", "txt"], accept_multiple_files=True, help="Upload the tenders to compare side by side")
+        else:
+            st.subheader("📁 Upload Document")
+            uploaded_file = st.file_uploader("Choose a PDF or TXT file", type=["pdf", "txt"], help="Upload your bid document for analysis")
         
         st.subheader("⚡ Quick Actions")
-        if st.button("🔄 Clear Analysis", use_container_width=True):
-            keys_to_clear = ["summary", "cleaned_text", "text_chunks", "user_question", "answer", "last_uploaded_file", "qa_history", "translated_text", "translated_lang"]
+        if compare_mode and st.button("🔄 Clear Comparison", use_container_width=True):
+            st.session_state.pop("comparison", None)
+            st.rerun()
+        if not compare_mode and st.button("🔄 Clear Analysis", use_container_width=True):
+            keys_to_clear = ["summary", "cleaned_text", "text_chunks", "chunk_pages", "user_question", "answer", "last_uploaded_file", "qa_history", "translations", "summary_ttft", "summary_fields", "traces", "document_key", "analysis_job", "question_job"]
             for key in keys_to_clear:
                 st.session_state.pop(key, None)
+            st.query_params.pop("job", None)
             st.rerun()
+        cache_stats = analysis_cache.stats()
+        llm_stats = llm_client.metrics.snapshot()
+        st.caption(f"Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses · "
+                   f"LLM: {llm_stats['requests']} requests, {llm_stats['retries']} retries, p50 {llm_stats['p50']:.2f}s, p95 {llm_stats['p95']:.2f}s")
+        if st.checkbox("⏱️ Show pipeline timings") and st.session_state.get("traces"):
+            render_trace_panel(st.session_state.traces)
 
         # --- NEW DROPDOWN TRANSLATION WIDGET ---
-        if "summary" in st.session_state and st.session_state.summary and not st.session_state.summary.startswith("Error"):
+        if not compare_mode and "summary" in st.session_state and st.session_state.summary and not st.session_state.summary.startswith("Error"):
             st.subheader("🗣️ Translate Summary")
 
             # --- MODIFIED: EXPANDED DICTIONARY OF LANGUAGES ---
@@ -336,88 +303,107 @@ def main():
                 "Portuguese": "Portuguese",
             }
 
-            selected_language = st.selectbox(
-                "Select a language:",
+            selected_languages = st.multiselect(
+                "Select languages:",
                 options=list(LANGUAGES.keys())
             )
 
             if st.button("Translate", use_container_width=True, type="primary"):
-                if selected_language:
-                    with st.spinner(f"Translating to {selected_language}..."):
-                        formal_language_name = LANGUAGES[selected_language]
-                        translated_text = translate_text_with_llm(st.session_state.summary, formal_language_name)
-                        st.session_state.translated_text = translated_text
-                        st.session_state.translated_lang = selected_language
-                        st.rerun()
+                if selected_languages:
+                    with trace(f"translate {', '.join(selected_languages)}") as tracer:
+                        translated = translate_summary(st.session_state.summary, [LANGUAGES[language] for language in selected_languages], progress=StreamlitProgress())
+                    record_trace("Translation", tracer)
+                    st.session_state.translations = {language: translated[LANGUAGES[language]] for language in selected_languages}
+                    st.rerun()
         # --- END OF NEW WIDGET ---
             
-        st.subheader("💡 Sample Questions")
-        sample_questions = ["What is the tender deadline?", "What are the eligibility criteria?", "What is the contract value?"]
-        for question in sample_questions:
-            if st.button(question, use_container_width=True):
-                st.session_state.user_question = question
+        if not compare_mode:
+            st.subheader("💡 Sample Questions")
+            for question in SAMPLE_QUESTIONS:
+                if st.button(question, use_container_width=True):
+                    st.session_state.user_question = question
+
+    if compare_mode:
+        render_comparison(uploaded_files)
+        render_footer()
+        return
 
     # Main content area
     uploaded_filename = uploaded_file.name if uploaded_file else None
     if st.session_state.get("last_uploaded_file") != uploaded_filename:
         st.session_state["last_uploaded_file"] = uploaded_filename
-        keys_to_clear = ["summary", "cleaned_text", "text_chunks", "user_question", "answer", "translated_text", "translated_lang"]
+        keys_to_clear = ["summary", "cleaned_text", "text_chunks", "chunk_pages", "user_question", "answer", "translations", "summary_ttft", "summary_fields", "traces", "document_key", "analysis_job", "question_job"]
         for key in keys_to_clear:
             st.session_state.pop(key, None)
+        st.query_params.pop("job", None)
 
-    if not uploaded_file:
+    if not uploaded_file and "analysis_job" not in st.session_state and st.query_params.get("job"):
+        # Reattach to the document in the URL after a refresh, or from another tab.
+        st.session_state.analysis_job = st.query_params["job"]
+    if uploaded_file and "analysis_job" not in st.session_state:
+        st.session_state.analysis_job = submit_analysis(job_queue, uploaded_file.getvalue(), uploaded_file.type == "application/pdf", uploaded_file.name, precompute=SAMPLE_QUESTIONS)
+        st.query_params["job"] = st.session_state.analysis_job
+
+    if not uploaded_file and "analysis_job" not in st.session_state:
         st.markdown("""<div class="upload-section"><h2>📤 Upload Your Bid Document</h2><p>Drag and drop a PDF or TXT file to get started with the analysis</p><p><em>Supported formats: PDF, TXT • Max size: 200MB</em></p></div>""", unsafe_allow_html=True)
         col1, col2, col3 = st.columns(3)
         with col1: st.markdown("### 🎯 Key Information Extraction\n- Tender Number & Details\n- Contract Value & EMD")
         with col2: st.markdown("### 🤖 AI-Powered Analysis\n- Intelligent Q&A System\n- Document Summarization")
         with col3: st.markdown("### 📊 Advanced Features\n- Error Handling & Retries\n- Progress Tracking")
 
-    if uploaded_file and "cleaned_text" not in st.session_state:
-        with st.spinner("🔄 Processing document..."):
-            progress_bar = st.progress(0)
-            try:
-                if uploaded_file.type == "application/pdf":
-                    raw_text = extract_text_from_pdf(uploaded_file)
-                else:
-                    raw_text = uploaded_file.getvalue().decode("utf-8", errors='replace')
-                progress_bar.progress(25)
-                
-                if not raw_text: st.stop()
-
-                cleaned_text = clean_text(raw_text)
-                progress_bar.progress(50)
-                
-                if not cleaned_text or len(cleaned_text.strip()) < 100:
-                    st.error("Document appears to be empty or too short for analysis."); st.stop()
-                st.session_state.cleaned_text = cleaned_text
-                
-                text_chunks = split_text_into_chunks(cleaned_text)
-                progress_bar.progress(75)
-                
-                if not text_chunks:
-                    st.error("Unable to process document into analyzable chunks."); st.stop()
-                st.session_state.text_chunks = text_chunks
-                
-                summary = generate_comprehensive_summary(text_chunks)
-                st.session_state.summary = summary
-                progress_bar.progress(100)
-            except Exception as e:
-                st.error(f"Error processing document: {str(e)}"); st.stop()
-        
-        st.success("✅ Document processed successfully!")
-        st.rerun()
+    if "analysis_job" in st.session_state and "cleaned_text" not in st.session_state:
+        job_id = st.session_state.analysis_job
+        job = job_queue.wait(job_id, JOB_WAIT_SECONDS)
+        if job is None or job["status"] == "failed":
+            st.session_state.pop("analysis_job")
+            st.query_params.pop("job", None)
+            st.error(job["error"] if job else "This analysis is no longer available. Please upload the document again."); st.stop()
+        if job["status"] == "done":
+            result = job_queue.result(job_id)
+            st.session_state.cleaned_text = result["cleaned_text"]
+            st.session_state.text_chunks = result["text_chunks"]
+            st.session_state.chunk_pages = result["chunk_pages"]
+            st.session_state.summary = result["summary"]
+            st.session_state.summary_fields = result["summary_fields"]
+            st.session_state.document_key = result["file_hash"]
+            st.session_state.summary_ttft = result["summary_ttft"]
+            if job_queue.tracer(job_id):
+                record_trace("Document", job_queue.tracer(job_id))
+            st.success("✅ Document processed successfully!")
+            st.rerun()
+        render_job_status(job_id)
 
     if "cleaned_text" in st.session_state:
         st.subheader("📋 Document Analysis Summary")
         if st.session_state.summary.startswith("Error"):
             st.markdown(f'<div class="error-card"><h4>⚠️ Summary Generation Error:</h4><p>{st.session_state.summary}</p></div>', unsafe_allow_html=True)
         else:
-            formatted_summary = format_summary_for_display(st.session_state.summary)
+            if st.session_state.get("summary_fields"):
+                formatted_summary = format_fields_for_display(st.session_state.summary_fields)
+            else:
+                formatted_summary = format_summary_for_display(st.session_state.summary)
             st.markdown(f'<div class="summary-card">{formatted_summary}</div>', unsafe_allow_html=True)
+            if st.session_state.get("summary_fields"):
+                with st.expander("🔎 Field sources and confidence"):
+                    chunk_pages = st.session_state.get("chunk_pages") or []
+                    st.dataframe([
+                        {
+                            "Field": field["label"],
+                            "Value": field["value"] or "",
+                            "Confidence": round(field["confidence"], 2),
+                            "Source": format_page_sources([chunk_pages[field["source_chunk"]]]) if field["source_chunk"] is not None and field["source_chunk"] < len(chunk_pages) else "",
+                            "Method": field["method"] or "",
+                        }
+                        for field in st.session_state.summary_fields
+                    ], use_container_width=True, hide_index=True)
+            if st.session_state.get("summary_ttft") is not None:
+                st.caption(f"⚡ Final summary started streaming after {st.session_state.summary_ttft:.2f}s")
 
-        if "translated_text" in st.session_state:
-            st.subheader(f"✅ Translated Summary ({st.session_state.translated_lang})")
-            st.markdown(f"""<style>.translated-card {{ border-left: 5px solid #28a745; }}</style><div class="summary-card translated-card"><p>{st.session_state.translated_text.replace(chr(10), '<br>')}</p></div>""", unsafe_allow_html=True)
+        if st.session_state.get("translations"):
+            st.subheader(f"✅ Translated Summary ({', '.join(st.session_state.translations)})")
+            st.markdown("<style>.translated-card { border-left: 5px solid #28a745; }</style>", unsafe_allow_html=True)
+            for tab, translated_text in zip(st.tabs(list(st.session_state.translations)), st.session_state.translations.values()):
+                tab.markdown(f"""<div class="summary-card translated-card"><p>{translated_text.replace(chr(10), '<br>')}</p></div>""", unsafe_allow_html=True)
         
         st.subheader("⬇️ Download Summaries")
         col1, col2 = st.columns(2)
@@ -430,11 +416,11 @@ def main():
                 use_container_width=True
             )
         with col2:
-            if "translated_text" in st.session_state and st.session_state.translated_text:
+            for language, translated_text in st.session_state.get("translations", {}).items():
                 st.download_button(
-                    label=f"📥 Download Translated ({st.session_state.translated_lang})",
-                    data=st.session_state.translated_text,
-                    file_name=f"bid_analysis_{st.session_state.translated_lang.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                    label=f"📥 Download Translated ({language})",
+                    data=translated_text,
+                    file_name=f"bid_analysis_{language.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
                     mime="text/plain",
                     use_container_width=True
                 )
@@ -447,14 +433,32 @@ def main():
         if (ask_button and user_question) or (user_question and user_question != st.session_state.get("last_question", "")):
             st.session_state.last_question = user_question
             if user_question.strip():
-                answer = answer_question_from_chunks(user_question, st.session_state.get("text_chunks", []))
-                st.session_state.qa_history.append((user_question, answer))
-                st.markdown(f'<div class="question-card"><h4>Your Question:</h4><p>{user_question}</p></div>', unsafe_allow_html=True)
+                st.session_state.question_job = (user_question, submit_question(job_queue, user_question, st.session_state.analysis_job, st.session_state.document_key))
+
+        if "question_job" in st.session_state:
+            question, job_id = st.session_state.question_job
+            st.markdown(f'<div class="question-card"><h4>Your Question:</h4><p>{question}</p></div>', unsafe_allow_html=True)
+            job = job_queue.wait(job_id, JOB_WAIT_SECONDS)
+            if job and job["status"] not in FINISHED:
+                render_job_status(job_id)
+            else:
+                del st.session_state.question_job
+                result = job_queue.result(job_id) if job and job["status"] == "done" else None
+                if result:
+                    answer = result["answer"]
+                else:
+                    error = job["error"] if job else "The question was lost. Please ask it again."
+                    answer = error if error.startswith("Error") else f"Error: {error}"
+                if job_queue.tracer(job_id):
+                    record_trace("Last question", job_queue.tracer(job_id))
+                st.session_state.qa_history.append((question, answer))
                 if answer.startswith("Error"):
                     st.markdown(f'<div class="error-card"><h4>⚠️ Error:</h4><p>{answer}</p></div>', unsafe_allow_html=True)
                 else:
                     formatted_answer = format_answer_for_display(answer)
                     st.markdown(f'<div class="answer-card"><h4>💡 Answer:</h4><p>{formatted_answer}</p></div>', unsafe_allow_html=True)
+                    if result.get("ttft") is not None:
+                        st.caption(f"⚡ Answer started streaming after {result['ttft']:.2f}s")
 
         if st.session_state.qa_history:
             with st.expander(f"📚 Q&A History ({len(st.session_state.qa_history)} questions)"):
@@ -464,8 +468,7 @@ def main():
                     else: st.markdown(f"**A:** {a}")
                     st.markdown("---")
 
-    st.markdown("---")
-    st.markdown("""<div style="text-align: center; padding: 2rem; color: #666;"><p>🚀 Bid Analyser Pro v2.0</p></div>""", unsafe_allow_html=True)
+    render_footer()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
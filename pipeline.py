@@ -0,0 +1,870 @@
+import contextvars
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+from extraction import OCR_LANGUAGES, OCR_WORKERS, PDF_WORKERS, discard_pool, iter_pdf_pages, ocr_available, ocr_image, shared_pool
+from answer_cache import find_answer, make_entry, normalize_question
+from field_extraction import extract_chunk_fields, format_fields_as_text, merge_field_candidates, parse_json_object
+from groq_client import GROQ_API_URL, GroqClient, GroqError, TokenBucket, LLM_REQUESTS_PER_SECOND
+from translation import join_translated_segments, segment_bodies, split_summary_segments
+from tracing import count, span, traced, traced_iter
+
+# Document pipeline shared by the Streamlit app and the batch CLI. Kept free of Streamlit
+# imports: progress and warnings are reported through a Progress object.
+load_dotenv()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "4"))
+QA_TOP_K = int(os.getenv("QA_TOP_K", "4"))
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "structured")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "3000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "150"))
+REDUCE_MAX_TOKENS = int(os.getenv("REDUCE_MAX_TOKENS", "5000"))
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "500"))
+TOUCH_FLUSH_ENTRIES = 1000
+TOUCH_FLUSH_SECONDS = 30.0
+QA_MEMO_MAX_ENTRIES = 200
+TRANSLATE_BATCH_TOKENS = int(os.getenv("TRANSLATE_BATCH_TOKENS", "800"))
+TRANSLATE_OUTPUT_FACTOR = 6
+TEXT_NFKC = os.getenv("TEXT_NFKC", "").lower() in ("1", "true", "yes")
+CLEAN_BLOCK_CHARS = 1 << 20
+OCR_LOOKAHEAD = 32
+# Memoized answers that say nothing about the document are not kept.
+UNANSWERED_PREFIXES = ("Error", "No relevant information", "No document content")
+# Summaries that report a failure instead of describing the document.
+SUMMARY_ERROR_PREFIXES = ("Error", "Unable", "No content")
+
+class DocumentError(Exception):
+    pass
+
+class Progress:
+    # Callback interface for long-running steps. stage() wraps a step, update() reports the
+    # fraction of the current stage that is done and warning() reports a recoverable
+    # problem. Callbacks are made from the calling thread only. This base class ignores them.
+    @contextmanager
+    def stage(self, message):
+        yield
+
+    def update(self, fraction):
+        pass
+
+    def warning(self, message):
+        pass
+
+NULL_PROGRESS = Progress()
+
+class WarningCollector(Progress):
+    # For work on background threads, where warnings cannot be shown as they happen.
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+# Control characters, soft hyphens, zero-width spaces and byte-order marks. Zero-width
+# (non-)joiners stay: Indic scripts need them.
+DROPPED_CHARS_PATTERN = re.compile(r"[\x00-\x08\x0e-\x1b\x7f-\x84\x86-\x9f\xad\u200b\ufeff]+")
+TOKEN_ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+PAGE_MARKER_PATTERN = re.compile(r"--- Page (\d+) ---")
+# Sentence ends, page markers and numbered section/clause headings.
+SEGMENT_BOUNDARY_PATTERN = re.compile(
+    r"(?<=[.!?])\s+|\s+(?=--- Page \d+ ---|(?:SECTION|Section|CLAUSE|Clause|CHAPTER|Chapter)\s+\d|\d+(?:\.\d+)+\s+[A-Z])"
+)
+MAX_SEGMENT_CHARS = 20000
+
+def estimate_tokens(text):
+    # Local stand-in for the Llama 3 tokenizer: one token per punctuation mark and per
+    # started six characters of each word. Within a few percent on English tender text.
+    return sum(1 + (len(piece) - 1) // 6 for piece in TOKEN_ESTIMATE_PATTERN.findall(text))
+
+def pack_batches(items, max_tokens, overhead=0):
+    # Consecutive items grouped greedily so each batch stays within max_tokens, counting
+    # overhead extra tokens per item for the prompt text around it. An item larger than
+    # max_tokens gets a batch of its own.
+    batches, batch, batch_tokens = [], [], 0
+    for item in items:
+        tokens = estimate_tokens(item) + overhead
+        if batch and batch_tokens + tokens > max_tokens:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def iter_segments(text_pieces):
+    buffer = ""
+    for piece in text_pieces:
+        buffer += piece
+        start = 0
+        for match in SEGMENT_BOUNDARY_PATTERN.finditer(buffer):
+            if match.end() == len(buffer):
+                break
+            segment = buffer[start:match.start()].strip()
+            if segment:
+                yield segment
+            start = match.end()
+        buffer = buffer[start:]
+        if len(buffer) > MAX_SEGMENT_CHARS:
+            yield buffer.strip()
+            buffer = ""
+    if buffer.strip():
+        yield buffer.strip()
+
+def split_oversized_word(word, max_tokens):
+    # Runs without spaces (glued PDF text, table dumps) are sliced by characters, about six
+    # per token; slices dense in punctuation are halved until they fit.
+    start = 0
+    while start < len(word):
+        piece = word[start:start + 6 * max_tokens]
+        while len(piece) > 1 and estimate_tokens(piece) > max_tokens:
+            piece = piece[:len(piece) // 2]
+        yield piece, estimate_tokens(piece)
+        start += len(piece)
+
+def split_oversized_segment(segment, max_tokens):
+    part, part_tokens = [], 0
+    for word in segment.split():
+        tokens = estimate_tokens(word)
+        if tokens > max_tokens:
+            if part:
+                yield " ".join(part), part_tokens
+                part, part_tokens = [], 0
+            yield from split_oversized_word(word, max_tokens)
+            continue
+        if part and part_tokens + tokens > max_tokens:
+            yield " ".join(part), part_tokens
+            part, part_tokens = [], 0
+        part.append(word)
+        part_tokens += tokens
+    if part:
+        yield " ".join(part), part_tokens
+
+def make_chunk(segments):
+    pages = [page for _, _, page in segments if page is not None]
+    return {
+        "text": " ".join(text for text, _, _ in segments),
+        "pages": (pages[0], pages[-1]) if pages else None,
+        "tokens": sum(tokens for _, tokens, _ in segments),
+    }
+
+def iter_chunks(text_pieces, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    # Packs whole sentences into chunks of up to max_tokens, only splitting a sentence that
+    # alone exceeds the budget. The last sentences of a chunk, up to overlap_tokens, are
+    # repeated at the start of the next one. Works on a stream of text pieces. The overlap
+    # is capped at half the budget: a larger one would carry almost a whole chunk into the
+    # next and make one chunk per sentence.
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    page = None
+    current, fresh = [], False
+    for segment in iter_segments(text_pieces):
+        marker = PAGE_MARKER_PATTERN.match(segment)
+        if marker:
+            page = int(marker.group(1))
+        tokens = estimate_tokens(segment)
+        parts = [(segment, tokens)] if tokens <= max_tokens else split_oversized_segment(segment, max_tokens)
+        for part, part_tokens in parts:
+            current_tokens = sum(tokens for _, tokens, _ in current)
+            if current_tokens + part_tokens > max_tokens:
+                if fresh:
+                    yield make_chunk(current)
+                    fresh = False
+                    tail, tail_tokens = [], 0
+                    for segment_entry in reversed(current):
+                        if tail_tokens + segment_entry[1] > overlap_tokens:
+                            break
+                        tail.insert(0, segment_entry)
+                        tail_tokens += segment_entry[1]
+                    current, current_tokens = tail, tail_tokens
+                while current and current_tokens + part_tokens > max_tokens:
+                    current_tokens -= current.pop(0)[1]
+            current.append((part, part_tokens, page))
+            fresh = True
+    if fresh:
+        yield make_chunk(current)
+
+def split_text_into_chunks(text, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS, chunk_pages=None):
+    if not text or len(text.strip()) == 0:
+        return []
+    chunks = list(iter_chunks([text], max_tokens, overlap_tokens))
+    if chunk_pages is not None:
+        chunk_pages.extend(chunk["pages"] for chunk in chunks)
+    return [chunk["text"] for chunk in chunks]
+
+def format_page_sources(page_ranges):
+    pages = sorted({page for page_range in page_ranges if page_range for page in range(page_range[0], page_range[1] + 1)})
+    spans = []
+    for page in pages:
+        if spans and page == spans[-1][1] + 1:
+            spans[-1][1] = page
+        else:
+            spans.append([page, page])
+    if not spans:
+        return ""
+    label = "page" if len(pages) == 1 else "pages"
+    return f"{label} " + ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in spans)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it", "of",
+    "on", "or", "shall", "that", "the", "this", "to", "what", "when", "which", "who", "will", "with",
+}
+# Tender documents rarely use the wording people ask with, so a few query terms are expanded.
+QUERY_SYNONYMS = {
+    "deadline": "last date due submission closing",
+    "value": "estimated cost amount",
+    "emd": "earnest money deposit",
+    "duration": "period completion months",
+    "eligibility": "qualification criteria turnover experience",
+    "payment": "bill release",
+}
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    # Built once per document from the chunk list; search() returns chunk indices by relevance.
+    def __init__(self, text_chunks, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.chunk_lengths = []
+        for i, chunk in enumerate(text_chunks):
+            counts = Counter(tokenize(chunk))
+            self.chunk_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((i, tf))
+        self.avg_length = sum(self.chunk_lengths) / max(1, len(self.chunk_lengths))
+        n = len(self.chunk_lengths)
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    def __len__(self):
+        return len(self.chunk_lengths)
+
+    def search(self, query, top_k=QA_TOP_K):
+        terms = set(tokenize(query))
+        for term in list(terms):
+            terms.update(tokenize(QUERY_SYNONYMS.get(term, "")))
+        scores = defaultdict(float)
+        for term in terms:
+            for i, tf in self.postings.get(term, ()):
+                norm = 1 - self.b + self.b * self.chunk_lengths[i] / (self.avg_length or 1)
+                scores[i] += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))[:top_k]
+        return ranked or list(range(min(top_k, len(self))))
+
+def iter_pdf_text(pdf_file, progress=NULL_PROGRESS):
+    if isinstance(pdf_file, bytes):
+        pdf_bytes = pdf_file
+    else:
+        pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+    pages = traced_iter("extract_page", iter_pdf_pages(pdf_bytes, PDF_WORKERS))
+    for page_num, page_text, error in iter_ocr_pages(pages, progress):
+        if error:
+            progress.warning(f"Error reading page {page_num}: {error}")
+        elif page_text.strip():
+            yield f"\n--- Page {page_num} ---\n{page_text}\n"
+
+def iter_ocr_pages(pages, progress=NULL_PROGRESS, max_workers=OCR_WORKERS, lookahead=OCR_LOOKAHEAD):
+    # Yields (page_number, text, error) in page order. Image-only pages are OCRed in the
+    # shared OCR process pool while the following pages are still being extracted, so text pages pay
+    # nothing for OCR. OCR text is cached per page image and language.
+    pending = deque()
+    skipped = []
+    executor = None
+    try:
+        for page_num, page_text, error, image in pages:
+            item = [page_num, page_text, error, None, None]
+            if image is not None:
+                key = hash_content(image, OCR_LANGUAGES)
+                cached = analysis_cache.get("ocr", key)
+                if cached is not None:
+                    item[1] = max(page_text, cached, key=len)
+                elif ocr_available():
+                    executor = executor or shared_pool("ocr", max(1, max_workers))
+                    item[3:] = executor.submit(ocr_image, image, OCR_LANGUAGES), key
+                elif not page_text.strip():
+                    skipped.append(page_num)
+            pending.append(item)
+            while pending and (pending[0][3] is None or pending[0][3].done() or len(pending) > lookahead):
+                yield finish_ocr_page(pending.popleft(), progress)
+        while pending:
+            yield finish_ocr_page(pending.popleft(), progress)
+    except BrokenProcessPool:
+        discard_pool("ocr", max(1, max_workers), executor)
+        raise
+    finally:
+        # The pool is shared with other documents; only this document's pages are cancelled.
+        for item in pending:
+            if item[3] is not None:
+                item[3].cancel()
+    if skipped:
+        progress.warning(f"{len(skipped)} pages contain only images and were skipped (first: page {skipped[0]}). Install Tesseract and pytesseract to read scanned pages.")
+
+def finish_ocr_page(item, progress):
+    page_num, page_text, error, future, key = item
+    if future is not None:
+        with span("ocr_page", page=page_num):
+            ocr_text, ocr_error = future.result()
+            count("ocr_pages")
+        if ocr_error:
+            progress.warning(f"OCR failed on page {page_num}: {ocr_error}")
+        elif ocr_text.strip():
+            analysis_cache.put("ocr", key, ocr_text)
+            page_text = max(page_text, ocr_text, key=len)
+    return page_num, page_text, error
+
+def iter_document_chunks(raw_pieces, collected, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    # Cleans and chunks pages as they are extracted so summarization can start before the
+    # last page is parsed. Raw pages, cleaned pages, chunks and their page ranges are kept
+    # in `collected`.
+    def cleaned_pieces():
+        for piece in raw_pieces:
+            collected["raw"].append(piece)
+            with span("clean_text", chars=len(piece)):
+                cleaned_piece = clean_text(piece)
+            if cleaned_piece:
+                if collected["cleaned"]:
+                    yield " "
+                collected["cleaned"].append(cleaned_piece)
+                yield cleaned_piece
+    for chunk in traced_iter("chunk", iter_chunks(cleaned_pieces(), max_tokens, overlap_tokens)):
+        collected["chunks"].append(chunk["text"])
+        collected["chunk_pages"].append(chunk["pages"])
+        yield chunk["text"]
+
+def normalize_text(text, nfkc=TEXT_NFKC):
+    # One regex pass drops invisible characters, then str.split() collapses every kind of
+    # Unicode whitespace. Rupee signs and regional scripts are kept.
+    if nfkc:
+        text = unicodedata.normalize("NFKC", text)
+    return " ".join(DROPPED_CHARS_PATTERN.sub("", text).split())
+
+def clean_text(text, nfkc=TEXT_NFKC):
+    # Normalizes in blocks ending on whitespace, so long TXT files never hold a word list
+    # for the whole document. Pages from iter_pdf_text are cleaned one at a time.
+    if not text:
+        return ""
+    if len(text) <= CLEAN_BLOCK_CHARS:
+        return normalize_text(text, nfkc)
+    blocks, start = [], 0
+    while start < len(text):
+        end = min(start + CLEAN_BLOCK_CHARS, len(text))
+        if end < len(text):
+            cut = max(text.rfind(char, start, end) for char in " \n\t")
+            end = cut + 1 if cut > start else end
+        block = normalize_text(text[start:end], nfkc)
+        if block:
+            blocks.append(block)
+        start = end
+    return " ".join(blocks)
+
+def map_chunks_concurrently(func, text_chunks, max_workers=LLM_MAX_WORKERS, on_progress=None):
+    # Results come back in chunk order; exceptions are returned in place of the result.
+    # text_chunks may be a generator: chunks are submitted as soon as they are produced.
+    futures = {}
+    completed = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for i, chunk in enumerate(text_chunks):
+            # Each task runs in a copy of this context so its spans join the active trace.
+            future = executor.submit(contextvars.copy_context().run, func, chunk)
+            future.add_done_callback(completed.append)
+            futures[future] = i
+            if on_progress:
+                on_progress(len(completed), len(futures))
+        results = [None] * len(futures)
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+            if on_progress:
+                on_progress(done, len(futures))
+    return results
+
+def hash_content(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class DiskCache:
+    # Content-addressed, size-capped LRU store kept in SQLite so it survives restarts and
+    # lost session state. Values are JSON; least recently read entries are evicted first.
+    # The total size is kept in a meta row, updated in the same transaction as each insert
+    # and eviction, so every process sharing the file enforces the cap on the same count.
+    # It is summed only when the row is first created. Read times are buffered and written with the next put, or every TOUCH_FLUSH_SECONDS, so hits do not
+    # commit.
+    def __init__(self, path, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = Counter()
+        self.misses = Counter()
+        self.lock = threading.Lock()
+        self.touched = {}
+        self.last_flush = time.monotonic()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, size INTEGER, accessed REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.execute("INSERT OR IGNORE INTO meta SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries")
+        self.conn.commit()
+
+    def get(self, namespace, key):
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace, keys):
+        # Returns {key: value} for the keys present.
+        found = {}
+        with self.lock:
+            now = time.time()
+            for key in keys:
+                row = self.conn.execute("SELECT value FROM entries WHERE key = ?", (f"{namespace}:{key}",)).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+                    self.touched[f"{namespace}:{key}"] = now
+            self.hits[namespace] += len(found)
+            self.misses[namespace] += len(keys) - len(found)
+            count("cache_hits", len(found))
+            count("cache_misses", len(keys) - len(found))
+            if len(self.touched) >= TOUCH_FLUSH_ENTRIES or time.monotonic() - self.last_flush >= TOUCH_FLUSH_SECONDS:
+                self.flush_touched()
+                self.conn.commit()
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def flush_touched(self):
+        # Caller holds the lock and commits.
+        if self.touched:
+            self.conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?", [(t, key) for key, t in self.touched.items()])
+            self.touched.clear()
+        self.last_flush = time.monotonic()
+
+    def put(self, namespace, key, value):
+        self.put_many(namespace, {key: value})
+
+    def put_many(self, namespace, items):
+        rows = []
+        for key, value in items.items():
+            data = json.dumps(value, ensure_ascii=False)
+            rows.append((f"{namespace}:{key}", data, len(data.encode("utf-8")), time.time()))
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock before the total is read, so another
+            # process cannot change it in between.
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.flush_touched()
+            total = self.conn.execute("SELECT value FROM meta WHERE key = 'total_size'").fetchone()[0]
+            for row in rows:
+                old = self.conn.execute("SELECT size FROM entries WHERE key = ?", (row[0],)).fetchone()
+                total += row[2] - (old[0] if old else 0)
+            self.conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+            if total > self.max_bytes:
+                evicted = []
+                for old_key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    total -= size
+                self.conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            self.conn.execute("UPDATE meta SET value = ? WHERE key = 'total_size'", (total,))
+            self.conn.commit()
+
+    def total_size(self):
+        with self.lock:
+            return self.conn.execute("SELECT value FROM meta WHERE key = 'total_size'").fetchone()[0]
+
+    def stats(self):
+        return {"hits": sum(self.hits.values()), "misses": sum(self.misses.values())}
+
+# Process-wide: Streamlit reruns re-execute main.py but reuse this imported module, so
+# every session and every batch worker shares one cache and one rate-limited client.
+analysis_cache = DiskCache(os.path.join(CACHE_DIR, "analysis.sqlite3"), int(CACHE_MAX_MB * 1024 * 1024))
+llm_client = GroqClient(GROQ_API_KEY, GROQ_API_URL, rate_limiter=TokenBucket(LLM_REQUESTS_PER_SECOND))
+background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+answer_memo_lock = threading.Lock()
+question_locks = {}
+question_locks_guard = threading.Lock()
+
+@traced("llm")
+def ask_llm(question, context, max_retries=3, on_token=None):
+    if not llm_client.api_key:
+        return "Error: GROQ_API_KEY not found in environment variables."
+    if not context or not context.strip():
+        return "Error: No context provided for analysis."
+    messages = [
+        {"role": "system", "content": "You are an expert document analyst specializing in bid and tender documents. Provide clear, accurate, and structured responses based on the document content. If information is not found, clearly state that."},
+        {"role": "user", "content": f"Document Content:\n{context}\n\nQuestion: {question}\n\nPlease provide a detailed and structured response based on the document content."}
+    ]
+    data = {"model": "llama3-8b-8192", "messages": messages, "temperature": 0.3, "max_tokens": 1000}
+    cache_key = hash_content(data["model"], question, hash_content(context), data["temperature"], data["max_tokens"])
+    cached = analysis_cache.get("llm", cache_key)
+    if cached is not None:
+        if on_token:
+            on_token(cached, 0.0)
+        return cached
+    try:
+        content = llm_client.chat(data, timeout=30, max_retries=max_retries, on_token=on_token)
+    except GroqError as e:
+        if e.status_code == 401:
+            return "Error: Invalid API key. Please check your GROQ_API_KEY."
+        if e.status_code:
+            return f"Error: {str(e)}"
+        return f"Error after {max_retries} attempts: {str(e)}"
+    if not content:
+        return "Error: Invalid response format from API."
+    analysis_cache.put("llm", cache_key, content)
+    return content
+
+def pack_translation_batches(segments, max_tokens=TRANSLATE_BATCH_TOKENS):
+    # Each segment costs a JSON key, quotes and a comma on top of its own tokens.
+    return pack_batches(segments, max_tokens, overhead=3)
+
+@traced("translate")
+def translate_segment_batch(segments, target_language, max_retries=3):
+    # One JSON-mode request per batch; returns {segment: translation} for the segments the
+    # response covers. max_tokens scales with the batch, since Indic scripts take several
+    # tokens per English word. Raises GroqError.
+    source = {str(i + 1): segment for i, segment in enumerate(segments)}
+    messages = [
+        {"role": "system", "content": f"You are an expert translator. Your task is to translate English text into {target_language} accurately. Respond only with a valid JSON object."},
+        {"role": "user", "content": f"Translate every value of the following JSON object from English to {target_language}. Keep the keys unchanged, and keep numbers, amounts, dates and reference codes as they are. Respond with a JSON object that has the same keys and the translated values, without explanations.\n\n{json.dumps(source, ensure_ascii=False)}"}
+    ]
+    tokens = sum(estimate_tokens(segment) for segment in segments)
+    data = {"model": "llama3-8b-8192", "messages": messages, "temperature": 0.1, "max_tokens": min(6000, TRANSLATE_OUTPUT_FACTOR * tokens + 200), "response_format": {"type": "json_object"}}
+    parsed = parse_json_object(llm_client.chat(data, timeout=45, max_retries=max_retries)) or {}
+    return {segment: parsed[key].strip() for key, segment in source.items() if isinstance(parsed.get(key), str) and parsed[key].strip()}
+
+def translate_segments(segments, target_language):
+    # Segments missing from a truncated or malformed response are retried in halves,
+    # down to one segment per request.
+    translations = translate_segment_batch(segments, target_language)
+    analysis_cache.put_many("translation", {hash_content(segment, target_language): translated for segment, translated in translations.items()})
+    missing = [segment for segment in segments if segment not in translations]
+    if missing and len(segments) > 1:
+        half = (len(missing) + 1) // 2
+        for part in (missing[:half], missing[half:]):
+            if part:
+                translations.update(translate_segments(part, target_language))
+    return translations
+
+def translate_summary(text, target_languages, max_workers=LLM_MAX_WORKERS, progress=NULL_PROGRESS):
+    # Translates the summary line by line into each language; returns {language: text}.
+    # Translations are cached per (segment, language), so switching back to a language or
+    # re-translating an updated summary only requests the lines that changed. Batches of
+    # all languages run concurrently on the shared client.
+    if not llm_client.api_key:
+        return {language: "Error: GROQ_API_KEY not found. Cannot translate." for language in target_languages}
+    segments = split_summary_segments(text)
+    bodies = segment_bodies(segments)
+    translations = {}
+    jobs = []
+    for language in target_languages:
+        keys = {body: hash_content(body, language) for body in bodies}
+        cached = analysis_cache.get_many("translation", list(keys.values()))
+        translations[language] = {body: cached[key] for body, key in keys.items() if key in cached}
+        missing = [body for body in bodies if keys[body] not in cached]
+        jobs.extend((language, batch) for batch in pack_translation_batches(missing))
+    errors = {}
+    if jobs:
+        with progress.stage(f"Translating {len(jobs)} batches..."), span("translate_batches", batches=len(jobs)):
+            results = map_chunks_concurrently(
+                lambda job: translate_segments(job[1], job[0]), jobs, max_workers,
+                on_progress=lambda done, total: progress.update(done / total)
+            )
+        for (language, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                errors[language] = result
+            else:
+                translations[language].update(result)
+    translated = {}
+    for language in target_languages:
+        done = translations[language]
+        if bodies and not done:
+            translated[language] = f"Error during translation API call: {errors.get(language) or 'no lines were translated'}"
+            continue
+        if len(done) < len(bodies):
+            progress.warning(f"{len(bodies) - len(done)} of {len(bodies)} lines could not be translated to {language} and are shown in English.")
+        translated[language] = join_translated_segments(segments, done)
+    return translated
+
+@traced("llm_json")
+def ask_llm_json(instructions, context, max_retries=3):
+    # JSON-mode completion for structured extraction; returns the parsed object or None.
+    messages = [
+        {"role": "system", "content": "You are an expert document analyst specializing in bid and tender documents. Respond only with a valid JSON object."},
+        {"role": "user", "content": f"Document Content:\n{context}\n\n{instructions}"}
+    ]
+    data = {"model": "llama3-8b-8192", "messages": messages, "temperature": 0.0, "max_tokens": 1000, "response_format": {"type": "json_object"}}
+    cache_key = hash_content(data["model"], "json", instructions, hash_content(context), data["temperature"], data["max_tokens"])
+    cached = analysis_cache.get("llm", cache_key)
+    if cached is not None:
+        return parse_json_object(cached)
+    try:
+        content = llm_client.chat(data, timeout=30, max_retries=max_retries)
+    except GroqError:
+        return None
+    parsed = parse_json_object(content)
+    if parsed is not None:
+        analysis_cache.put("llm", cache_key, content)
+    return parsed
+
+def generate_structured_summary(text_chunks, max_workers=LLM_MAX_WORKERS, progress=NULL_PROGRESS):
+    # One JSON extraction per chunk (after a local regex pre-pass), merged in Python:
+    # no reduce-step LLM call. Returns (summary_text, fields).
+    ask_json = ask_llm_json if llm_client.api_key else None
+
+    def extract(item):
+        with span("extract_fields", chunk=item[0]):
+            return extract_chunk_fields(item[1], item[0], ask_json)
+
+    with progress.stage("Extracting key fields..."), span("map_fields"):
+        results = map_chunks_concurrently(
+            extract, enumerate(text_chunks), max_workers,
+            on_progress=lambda done, total: progress.update(done / total)
+        )
+    if not results:
+        return "No content available for summarization.", []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            progress.warning(f"Error processing chunk {i+1}: {str(result)}")
+    with span("merge_fields"):
+        fields = merge_field_candidates([result for result in results if not isinstance(result, Exception)])
+    if not any(field["value"] for field in fields):
+        return "Unable to generate summary due to processing errors.", fields
+    return format_fields_as_text(fields), fields
+
+def summarize_document(text_chunks, on_token=None, progress=NULL_PROGRESS, mode=None):
+    # Returns (summary_text, fields); fields is None in prose mode.
+    mode = mode or SUMMARY_MODE
+    with span("summarize", mode=mode):
+        if mode == "structured":
+            return generate_structured_summary(text_chunks, progress=progress)
+        return generate_comprehensive_summary(text_chunks, on_token=on_token, progress=progress), None
+
+def generate_comprehensive_summary(text_chunks, max_workers=LLM_MAX_WORKERS, on_token=None, progress=NULL_PROGRESS):
+    if not text_chunks:
+        return "No content available for summarization."
+    summary_prompt = """Analyze this bid/tender document and extract the following key information. If any information is not found, clearly state "Not mentioned" or "Not found":\n\n**BASIC INFORMATION:**\n- Tender Number/Reference:\n- Name of Work/Project:\n- Issuing Department/Organization:\n\n**FINANCIAL DETAILS:**\n- Estimated Contract Value:\n- EMD (Earnest Money Deposit):\n- EMD Exemption (if any):\n- Performance Security:\n\n**TIMELINE:**\n- Bid Submission Deadline:\n- Technical Bid Opening:\n- Contract Duration:\n\n**REQUIREMENTS:**\n- Key Eligibility Criteria:\n- Required Documents:\n- Technical Specifications (brief):\n- Payment Terms:\n\nProvide only the information that is clearly mentioned in the document."""
+    all_summaries = []
+    with progress.stage("Analyzing document sections..."), span("map_summaries"):
+        results = map_chunks_concurrently(
+            lambda chunk: ask_llm(summary_prompt, chunk), text_chunks, max_workers,
+            on_progress=lambda done, total: progress.update(done / total)
+        )
+    if not results:
+        return "No content available for summarization."
+    for i, summary in enumerate(results):
+        if isinstance(summary, Exception):
+            progress.warning(f"Error processing chunk {i+1}: {str(summary)}")
+        elif not summary.startswith("Error"):
+            all_summaries.append(summary)
+    if not all_summaries:
+        return "Unable to generate summary due to processing errors."
+    with span("reduce_summaries", summaries=len(all_summaries)):
+        return tree_reduce_summaries(all_summaries, max_workers, on_token, progress=progress)
+
+def pack_summary_batches(summaries, max_tokens):
+    # Each summary costs a "Section N:" header on top of its own tokens.
+    batches = pack_batches(summaries, max_tokens, overhead=5)
+    if len(batches) == len(summaries) > 1:
+        # Every summary alone fills the budget; merge pairs so each level still halves.
+        batches = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+    return batches
+
+def tree_reduce_summaries(summaries, max_workers=LLM_MAX_WORKERS, on_token=None, max_tokens=REDUCE_MAX_TOKENS, progress=NULL_PROGRESS):
+    # Merges per-chunk summaries in token-budgeted batches, level by level, until one is
+    # left. Merges within a level run concurrently; only the final merge is streamed.
+    final_summary_prompt = "The document content above consists of analysis sections from the same document. Create a single comprehensive summary by combining and deduplicating the information. Provide a final consolidated summary with the same structure, keeping only the most complete and accurate information for each field."
+
+    def merge(batch, stream=None):
+        if len(batch) == 1:
+            return batch[0]
+        sections = chr(10).join([f"Section {i+1}:{chr(10)}{summary}{chr(10)}" for i, summary in enumerate(batch)])
+        return ask_llm(final_summary_prompt, sections, on_token=stream)
+
+    level = 0
+    while len(summaries) > 1:
+        level += 1
+        batches = pack_summary_batches(summaries, max_tokens)
+        with progress.stage(f"Consolidating {len(summaries)} section summaries (level {level})..."), span("reduce_level", level=level, batches=len(batches)):
+            if len(batches) == 1:
+                results = [merge(batches[0], on_token)]
+            else:
+                results = map_chunks_concurrently(merge, batches, max_workers, on_progress=lambda done, total: progress.update(done / total))
+        summaries = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception) or result.startswith("Error"):
+                progress.warning(f"Could not consolidate {len(batch)} section summaries at level {level}; keeping the most detailed one.")
+                result = max(batch, key=len)
+            summaries.append(result)
+    return summaries[0]
+
+def search_chunks_for_answer(question, text_chunks, chunk_index=None, top_k=QA_TOP_K, max_workers=LLM_MAX_WORKERS, chunk_pages=None, on_token=None, progress=NULL_PROGRESS):
+    if not text_chunks:
+        return "No document content available to answer the question."
+    selected = list(range(len(text_chunks)))
+    if top_k:
+        with span("retrieve", top_k=top_k):
+            chunk_index = chunk_index or BM25Index(text_chunks)
+            selected = sorted(chunk_index.search(question, top_k))
+    relevant_answers = []
+    relevant_pages = []
+    with progress.stage("Searching through document..."), span("map_answers", chunks=len(selected)):
+        results = map_chunks_concurrently(
+            lambda i: ask_llm(question, text_chunks[i]), selected, max_workers,
+            on_progress=lambda done, total: progress.update(done / total)
+        )
+    for i, answer in zip(selected, results):
+        if isinstance(answer, Exception):
+            progress.warning(f"Error processing chunk {i+1}: {str(answer)}")
+        elif (not answer.startswith("Error") and "not found" not in answer.lower() and "not mentioned" not in answer.lower() and len(answer.strip()) > 20):
+            relevant_answers.append(answer)
+            if chunk_pages:
+                relevant_pages.append(chunk_pages[i])
+    if not relevant_answers:
+        return "No relevant information found in the document to answer your question."
+    sources = format_page_sources(relevant_pages)
+    sources = f"\n\nSources: {sources}" if sources else ""
+    if len(relevant_answers) == 1:
+        return relevant_answers[0] + sources
+    sections = chr(10).join([f'Section {i+1}: {answer}' for i, answer in enumerate(relevant_answers)])
+    combined_prompt = f"Question: {question}\n\nThe document content above consists of multiple relevant sections. Provide a comprehensive answer by combining the relevant information from all sections, removing duplicates and contradictions."
+    try:
+        with span("combine_answers", answers=len(relevant_answers)):
+            final_answer = ask_llm(combined_prompt, sections, on_token=on_token)
+        return (final_answer if not final_answer.startswith("Error") else relevant_answers[0]) + sources
+    except:
+        return relevant_answers[0] + sources
+
+@contextmanager
+def question_lock(memo_key, question):
+    # One lock per question being answered, dropped once nobody holds or waits for it.
+    key = (memo_key, normalize_question(question))
+    with question_locks_guard:
+        entry = question_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with question_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del question_locks[key]
+
+def remember_answer(memo_key, question, answer):
+    with answer_memo_lock:
+        entries = analysis_cache.get("answers", memo_key) or []
+        entries.append(make_entry(question, answer))
+        analysis_cache.put("answers", memo_key, entries[-QA_MEMO_MAX_ENTRIES:])
+
+def answer_question_from_chunks(question, text_chunks, chunk_index=None, top_k=QA_TOP_K, max_workers=LLM_MAX_WORKERS, chunk_pages=None, on_token=None, progress=NULL_PROGRESS, document_key=None):
+    # With a document_key, answers are memoized per document. Repeated and near-duplicate
+    # questions are answered from the memo, and a question that is already being answered
+    # (by precompute_answers, say) waits for that answer instead of asking the LLM again.
+    if not document_key:
+        return search_chunks_for_answer(question, text_chunks, chunk_index, top_k, max_workers, chunk_pages, on_token, progress)
+    memo_key = hash_content(document_key, top_k, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+    with question_lock(memo_key, question):
+        with span("answer_memo"):
+            answer = find_answer(analysis_cache.get("answers", memo_key) or [], question)
+        if answer is not None:
+            if on_token:
+                on_token(answer, 0.0)
+            return answer
+        answer = search_chunks_for_answer(question, text_chunks, chunk_index, top_k, max_workers, chunk_pages, on_token, progress)
+        if not answer.startswith(UNANSWERED_PREFIXES):
+            remember_answer(memo_key, question, answer)
+        return answer
+
+def precompute_answers(questions, text_chunks, document_key, chunk_index=None, chunk_pages=None):
+    # Answers the questions one after another on a background thread so they are already
+    # memoized when asked. Returns the futures.
+    return [
+        background_executor.submit(answer_question_from_chunks, question, text_chunks, chunk_index, chunk_pages=chunk_pages, document_key=document_key)
+        for question in questions
+    ]
+
+def analyze_document(file_bytes, is_pdf, progress=NULL_PROGRESS, on_token=None, mode=None):
+    # Extraction, cleaning, chunking and summary for one file, reusing every cached stage.
+    # Raises DocumentError when the file has nothing to analyse.
+    file_hash = hash_content(file_bytes)
+    chunking_key = hash_content(file_hash, "normalize_text", TEXT_NFKC, "iter_chunks", CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+    # Text extracted without OCR is not reused once OCR is available.
+    extract_key = hash_content(file_hash, "ocr", OCR_LANGUAGES) if is_pdf and ocr_available() else file_hash
+    raw_text = analysis_cache.get("extract", extract_key)
+    summary = summary_fields = None
+    if raw_text is None and is_pdf:
+        # Stream pages straight into chunking and summarization.
+        collected = {"raw": [], "cleaned": [], "chunks": [], "chunk_pages": []}
+        summary, summary_fields = summarize_document(
+            iter_document_chunks(iter_pdf_text(file_bytes, progress), collected), on_token=on_token, progress=progress, mode=mode
+        )
+        raw_text = "".join(collected["raw"])
+        if not raw_text.strip():
+            if ocr_available():
+                raise DocumentError("No text could be extracted from the PDF, even with OCR. The PDF might be password-protected or its scans unreadable.")
+            raise DocumentError("No text could be extracted from the PDF. The PDF might be password-protected, or contain only images and OCR is not installed (Tesseract and pytesseract).")
+        analysis_cache.put("extract", extract_key, raw_text)
+        cleaned_text, text_chunks, chunk_pages = " ".join(collected["cleaned"]), collected["chunks"], collected["chunk_pages"]
+        analysis_cache.put("chunks", chunking_key, {"cleaned_text": cleaned_text, "text_chunks": text_chunks, "chunk_pages": chunk_pages})
+    else:
+        if raw_text is None:
+            with span("extract", chars=len(file_bytes)):
+                raw_text = file_bytes.decode("utf-8", errors='replace')
+            if raw_text:
+                analysis_cache.put("extract", extract_key, raw_text)
+        progress.update(0.25)
+        if not raw_text:
+            raise DocumentError("Document is empty.")
+        cached = analysis_cache.get("chunks", chunking_key)
+        if cached:
+            cleaned_text, text_chunks, chunk_pages = cached["cleaned_text"], cached["text_chunks"], cached["chunk_pages"]
+        else:
+            with span("clean_text", chars=len(raw_text)):
+                cleaned_text, chunk_pages = clean_text(raw_text), []
+            with span("chunk"):
+                text_chunks = split_text_into_chunks(cleaned_text, chunk_pages=chunk_pages)
+            analysis_cache.put("chunks", chunking_key, {"cleaned_text": cleaned_text, "text_chunks": text_chunks, "chunk_pages": chunk_pages})
+    progress.update(0.5)
+    if not cleaned_text or len(cleaned_text.strip()) < 100:
+        raise DocumentError("Document appears to be empty or too short for analysis.")
+    if not text_chunks:
+        raise DocumentError("Unable to process document into analyzable chunks.")
+    progress.update(0.75)
+    if summary is None:
+        summary, summary_fields = summarize_document(text_chunks, on_token=on_token, progress=progress, mode=mode)
+    progress.update(1.0)
+    return {
+        "file_hash": file_hash,
+        "cleaned_text": cleaned_text,
+        "text_chunks": text_chunks,
+        "chunk_pages": chunk_pages,
+        "summary": summary,
+        "summary_fields": summary_fields,
+    }
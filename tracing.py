@@ -0,0 +1,191 @@
+import contextvars
+import functools
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Lightweight spans for the document pipeline. A trace is activated for one document or
+# question with trace(); span() and count() are no-ops outside of one. The active trace
+# and span live in context variables; worker threads see them when each task is run in
+# a copy of the submitting context (see map_chunks_concurrently).
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+TRACE_DIR = os.getenv("TRACE_DIR")
+
+# Counters summed per stage in Tracer.summary().
+COUNTERS = ("prompt_tokens", "completion_tokens", "llm_calls", "retries", "cache_hits", "cache_misses", "rate_limit_wait", "ocr_pages")
+
+
+class Tracer:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def start_span(self, name, attrs):
+        parent = _current_span.get()
+        span = {
+            "id": next(self.ids),
+            "parent": parent["id"] if parent else None,
+            "name": name,
+            "start": time.perf_counter() - self.started,
+            "end": None,
+            "thread": threading.get_ident(),
+            "attrs": dict(attrs),
+        }
+        with self.lock:
+            self.spans.append(span)
+        return span
+
+    def add(self, span, key, amount):
+        with self.lock:
+            span["attrs"][key] = span["attrs"].get(key, 0) + amount
+
+    def inclusive_counters(self, spans):
+        # Counters of each span plus everything recorded in spans nested under it, so a
+        # stage carries the tokens and retries of the LLM calls it made.
+        counters = {span["id"]: Counter({key: span["attrs"][key] for key in COUNTERS if key in span["attrs"]}) for span in spans}
+        for span in reversed(spans):
+            if span["parent"] in counters:
+                counters[span["parent"]].update(counters[span["id"]])
+        return counters
+
+    def discard(self, span):
+        # Drops a span; spans nested under it move up to its parent.
+        with self.lock:
+            self.spans.remove(span)
+            for other in self.spans:
+                if other["parent"] == span["id"]:
+                    other["parent"] = span["parent"]
+
+    def summary(self):
+        # Per span name: call count, total seconds, self seconds and inclusive counters.
+        # Self seconds leave out the time of spans nested under a span on the same thread,
+        # so a stage that pulls pages through a generator is not charged for extracting
+        # them. Work handed to other threads is not subtracted: the span waited for it.
+        with self.lock:
+            spans = list(self.spans)
+        counters = self.inclusive_counters(spans)
+        durations = {span["id"]: (span["end"] if span["end"] is not None else span["start"]) - span["start"] for span in spans}
+        threads = {span["id"]: span["thread"] for span in spans}
+        self_seconds = dict(durations)
+        for span in spans:
+            if span["parent"] in self_seconds and threads[span["parent"]] == span["thread"]:
+                self_seconds[span["parent"]] -= durations[span["id"]]
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span["name"], {"count": 0, "seconds": 0.0, "self_seconds": 0.0, **{key: 0 for key in COUNTERS}})
+            stage["count"] += 1
+            stage["seconds"] += durations[span["id"]]
+            stage["self_seconds"] += max(0.0, self_seconds[span["id"]])
+            for key, value in counters[span["id"]].items():
+                stage[key] += value
+        return stages
+
+    def totals(self):
+        # Inclusive counters and wall time of the root span.
+        with self.lock:
+            spans = list(self.spans)
+        if not spans:
+            return {"seconds": 0.0, **{key: 0 for key in COUNTERS}}
+        root = spans[0]
+        counters = self.inclusive_counters(spans)[root["id"]]
+        end = root["end"] if root["end"] is not None else time.perf_counter() - self.started
+        return {"seconds": end - root["start"], **{key: counters.get(key, 0) for key in COUNTERS}}
+
+    def to_chrome_trace(self):
+        # Complete ("X") events in microseconds; load in chrome://tracing or ui.perfetto.dev.
+        with self.lock:
+            spans = list(self.spans)
+        threads = {}
+        events = []
+        for span in spans:
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            end = span["end"] if span["end"] is not None else span["start"]
+            events.append({
+                "name": span["name"], "cat": "pipeline", "ph": "X", "pid": 1, "tid": tid,
+                "ts": round(span["start"] * 1e6), "dur": round((end - span["start"]) * 1e6),
+                "args": span["attrs"],
+            })
+        events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace": self.name, "summary": self.summary()}}
+
+    def export(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def export_to_dir(self, directory):
+        name = re.sub(r"[^\w.-]+", "_", self.name)
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{name}.trace.json")
+        self.export(path)
+        return path
+
+
+@contextmanager
+def trace(name):
+    tracer = Tracer(name)
+    trace_token = _current_trace.set(tracer)
+    span_token = _current_span.set(None)
+    try:
+        with span(name):
+            yield tracer
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def span(name, **attrs):
+    tracer = _current_trace.get()
+    if tracer is None:
+        yield
+        return
+    record = tracer.start_span(name, attrs)
+    token = _current_span.set(record)
+    try:
+        yield record
+    finally:
+        record["end"] = time.perf_counter() - tracer.started
+        _current_span.reset(token)
+
+
+def count(key, amount=1):
+    # Adds to a counter on the innermost open span of the calling context.
+    tracer, record = _current_trace.get(), _current_span.get()
+    if tracer is not None and record is not None:
+        tracer.add(record, key, amount)
+
+
+def traced_iter(name, iterable):
+    # Records one span per item for the time spent producing it, so stages that stream
+    # through generators (page extraction, chunking) show up with their own durations.
+    # The final next() that finds the iterator exhausted leaves no span.
+    iterator = iter(iterable)
+    while True:
+        with span(name) as record:
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            if record is not None:
+                _current_trace.get().discard(record)
+            return
+        yield item
+
+
+def traced(name, **attrs):
+    # Decorator form of span().
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
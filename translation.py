@@ -0,0 +1,30 @@
+import re
+
+# Splits a summary into line segments for translation and puts the translations back.
+# Bullets, numbering and bold markers stay outside the translated text, so the layout of
+# the summary survives whatever the model does with markdown.
+LINE_PATTERN = re.compile(r"^(\s*(?:[-*•]\s+|\d+[.)]\s+)?(?:\*\*)?)(.*?)((?:\*\*)?\s*)$")
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+
+def split_summary_segments(text):
+    # Returns (prefix, body, suffix) per line. body is empty for lines with nothing to
+    # translate (blank lines, rules, bare numbers), whose text is kept in prefix.
+    segments = []
+    for line in text.split("\n"):
+        prefix, body, suffix = LINE_PATTERN.match(line).groups()
+        if not LETTER_PATTERN.search(body):
+            segments.append((line, "", ""))
+        else:
+            segments.append((prefix, body, suffix))
+    return segments
+
+
+def segment_bodies(segments):
+    # Distinct bodies in first-seen order; repeated lines are translated once.
+    return list(dict.fromkeys(body for _, body, _ in segments if body))
+
+
+def join_translated_segments(segments, translations):
+    # Bodies missing from translations stay in English.
+    return "\n".join(f"{prefix}{translations.get(body, body) if body else ''}{suffix}" for prefix, body, suffix in segments)